@@ -2,19 +2,40 @@
 import os
 import random
 import string
-from Crypto.Cipher import AES
 import base64
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+from html.parser import HTMLParser
 import pickle
+import gzip
+import mmap
+import hashlib
+import shutil
+import tempfile
 import json
+import io
+import codecs
+from collections import deque
+from queue import Queue, Empty
+import socket
+import atexit
 import re
 import subprocess
 from getpass import getpass
 import time
-from termcolor import cprint
+from datetime import datetime, timezone
+import math
+import functools
+import signal
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import colorama
+try:
+    import fcntl
+    import resource
+except ImportError:
+    fcntl = None
+    resource = None
 
 SAVE_DIR = "./save"
 KEY_PATH = os.path.join(SAVE_DIR, "key.txt")
@@ -22,14 +43,326 @@ ACCOUNT_JSON_PATH = os.path.join(SAVE_DIR, "account.json")
 SRC_PATH_TXT_PATH = os.path.join(SAVE_DIR, "src_path.txt")
 SESSION_PICKLE_PATH = os.path.join(SAVE_DIR, "session.pickle")
 TESTCASES_DIR = os.path.join(SAVE_DIR, "testcases")
-
-BASE_URL = "https://atcoder.jp/"
+BUILD_CACHE_DIR = os.path.join(SAVE_DIR, "build_cache")
+BUILD_CACHE_JSON_PATH = os.path.join(BUILD_CACHE_DIR, "index.json")
+STRESS_DIR = os.path.join(SAVE_DIR, "stress")
+HTTP_CACHE_DIR = os.path.join(SAVE_DIR, "http_cache")
+MIRROR_DIR = os.path.join(SAVE_DIR, "mirror")
+PROFILE_DIR = os.path.join(SAVE_DIR, "profile")
+HISTORY_DB_PATH = os.path.join(SAVE_DIR, "history.sqlite3")
+TRACE_JSON_PATH = os.path.join(SAVE_DIR, "trace.json")
+CPP_FLAGS_TXT_PATH = os.path.join(SAVE_DIR, "cpp_flags.txt")
+PCH_DIR = os.path.join(SAVE_DIR, "pch")
+
+BASE_URL = os.environ.get('ATCODER_SUPPORTER_BASE_URL', "https://atcoder.jp/")
 LOGIN_URL = urljoin(BASE_URL, "login")
+SESSION_COOKIE_NAME = "REVEL_SESSION"
+
+DOWNLOAD_JOBS = 4
+DOWNLOAD_RATE = 10
+DOWNLOAD_RETRY_INTERVAL = 0.2
+DOWNLOAD_RETRY = 3
+
+PREFETCH_INTERVAL = 1
+PREFETCH_MAX_INTERVAL = 10
+
+HTTP_CACHE_TTL = 60
+HTTP_CACHE_MAX_AGE = 7 * 24 * 60 * 60
+HTTP_CACHE_SIZE_LIMIT = 64 * 1024 * 1024
+UNCHANGED = object()
+
+DIV_RE = re.compile("div|section")
+HEADING_RE = re.compile("h[0-9]")
+PARAGRAPH_RE = re.compile("p|section")
+LANG_JA_SPAN_RE = re.compile(
+    r"""<span\b[^>]*\bclass\s*=\s*["'][^"']*\blang-ja\b[^>]*>""")
+TIME_LIMIT_RE = re.compile(r'実行時間制限\s*:\s*([0-9.]+)\s*sec')
+MEMORY_LIMIT_RE = re.compile(r'メモリ制限\s*:\s*([0-9.]+)\s*Mi?B')
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+             'link', 'meta', 'param', 'source', 'track', 'wbr'}
+IMPLIED_P_END_TAGS = {'address', 'article', 'aside', 'blockquote', 'div',
+                      'dl', 'fieldset', 'figure', 'footer', 'form', 'h1',
+                      'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr', 'main',
+                      'nav', 'ol', 'p', 'pre', 'section', 'table', 'ul'}
+IMPLIED_END_SCOPE = {'button', 'table', 'td', 'th', 'caption', 'html'}
+
+BUILD_CACHE_SIZE_LIMIT = 256 * 1024 * 1024
+DEFAULT_CPP_FLAGS = ['-Wall', '-std=gnu++20', '-O2']
+PCH_HEADER = 'bits/stdc++.h'
+MMAP_THRESHOLD = 1024 * 1024
+MEMORY_POLL_INTERVAL = 0.005
+PIPE_CHUNK_SIZE = 1024 * 1024
+CONSUMER_BUFFER_SIZE = 4 * 1024 * 1024
+OUTPUT_LIMIT = 64 * 1024 * 1024
+JUDGE_CONTEXT_LINES = 2
+JUDGE_LINE_WIDTH = 200
+STRESS_COUNT = 1000
+STRESS_TIMEOUT = 10
+COMPLEXITY_STEPS = 10
+COMPLEXITY_REPEAT = 3
+COMPLEXITY_TIMEOUT_RATE = 5
+WATCH_POLL_INTERVAL = 0.1
+WATCH_DEBOUNCE = 0.1
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+
+LANGUAGE_NAME_RES = {
+    '.java': re.compile(r'^Java\b'),
+    '.cpp': re.compile(r'^C\+\+.*(GCC|gcc)'),
+    '.py': re.compile(r'^Python.*CPython')
+}
+
+SUBMISSION_POLL_INTERVAL = 0.2
+SUBMISSION_MAX_POLL_INTERVAL = 3
+SUBMISSION_ID_RE = re.compile(r'submission-score[^>]*data-id="([0-9]+)"')
+SUBMISSION_LABEL_RE = re.compile(r'<span[^>]*class=.label[^>]*>([^<]*)</span>')
+SUBMISSION_PENDING_RE = re.compile(r'WJ|WR|Judging|[0-9]+/[0-9]+')
+SUBMISSION_TIME_RE = re.compile(r'([0-9]+) ms')
+SUBMISSION_MEMORY_RE = re.compile(r'([0-9]+) KB')
+
+DEFAULT_TESTCASE_INFO = {'time limit': 2, 'memory limit': None,
+                         'maximum error': 0}
+INPUT_DIR_NAMES = ('in', 'input')
+OUTPUT_DIR_NAMES = ('out', 'output')
+OUTPUT_EXTS = ('.out', '.ans')
+
+PROFILE_TOP = 15
+PROFILE_REPORT_LINES = 30
+PROFILE_TIMEOUT_RATE = 10
+PROFILE_SAMPLE_INTERVAL = 0.001
+
+HISTORY_REGRESSION_RATE = 0.2
+HISTORY_REGRESSION_MIN_TIME = 20
+HISTORY_VERSIONS = 5
+
+SOURCE_EXTS = ('.cpp', '.py', '.java')
+EXIT_AC = 0
+EXIT_FAILED = 1
+EXIT_ERROR = 2
+
+LAZY_MODULES = ['requests', 'bs4', 'lxml', 'Crypto.Cipher.AES', 'termcolor']
+
+WARM_MODULES = ['numpy', 'scipy', 'networkx', 'sortedcontainers',
+                'collections', 'itertools', 'heapq', 'bisect', 'math']
+FORK_SERVER_CODE = """
+import importlib, json, os, resource, runpy, socket, sys, time, traceback
+def read_peak_memory():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return line.split()[1]
+    except OSError:
+        pass
+    return ''
+for name in sys.argv[2].split(','):
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        pass
+sock = socket.socket(fileno=int(sys.argv[1]))
+sock.sendall(b'{}\\n')
+while True:
+    message, fds, _, _ = socket.recv_fds(sock, 65536, 3)
+    if not message:
+        break
+    request = json.loads(message)
+    ready_r, ready_w = os.pipe()
+    fork_time = time.monotonic()
+    pid = os.fork()
+    if pid == 0:
+        sock.close()
+        os.close(ready_r)
+        for i, fd in enumerate(fds):
+            os.dup2(fd, i)
+            os.close(fd)
+        for limit, value in ((resource.RLIMIT_CPU, request['cpu limit']),
+                             (resource.RLIMIT_AS, request['memory limit'])):
+            if value:
+                resource.setrlimit(limit, (value, value))
+        os.chdir(request['cwd'] or '.')
+        sys.path.insert(0, os.getcwd())
+        sys.argv = [request['script']]
+        sys.stdin = open(0, 'r', closefd=False)
+        sys.stdout = open(1, 'w', closefd=False)
+        sys.stderr = open(2, 'w', closefd=False)
+        os.write(ready_w, f'{time.monotonic()} {read_peak_memory()}'.encode())
+        os.close(ready_w)
+        code = 0
+        try:
+            runpy.run_path(request['script'], run_name='__main__')
+        except SystemExit as e:
+            if isinstance(e.code, int) or e.code is None:
+                code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                code = 1
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(code)
+    os.close(ready_w)
+    for fd in fds:
+        os.close(fd)
+    sock.sendall(json.dumps({'pid': pid}).encode() + b'\\n')
+    _, status, rusage = os.wait4(pid, 0)
+    end_time = time.monotonic()
+    ready = os.read(ready_r, 64).split()
+    os.close(ready_r)
+    ready_time = float(ready[0]) if ready else end_time
+    # The child starts out with everything this server has imported, so
+    # only its growth past the peak it had right after the fork is its own.
+    inherited_memory = int(ready[1]) if len(ready) > 1 else None
+    sock.sendall(json.dumps({
+        'returncode': os.waitstatus_to_exitcode(status),
+        'wall time': end_time - fork_time,
+        'startup time': ready_time - fork_time,
+        'cpu time': rusage.ru_utime + rusage.ru_stime,
+        'memory': (max(rusage.ru_maxrss - inherited_memory, 0)
+                   if inherited_memory is not None else None)
+    }).encode() + b'\\n')
+"""
+LINE_SAMPLER_CODE = """
+import collections, runpy, signal, sys, time
+src_path, counts_path, interval = sys.argv[1], sys.argv[2], float(sys.argv[3])
+counts = collections.Counter()
+last_time = time.process_time()
+def sample(signum, frame):
+    # Signals raised during one long C call arrive as a single call here,
+    # so each sample is weighted by the CPU time since the previous one.
+    global last_time
+    now = time.process_time()
+    while frame is not None and frame.f_code.co_filename != src_path:
+        frame = frame.f_back
+    if frame is not None:
+        counts[frame.f_lineno] += now - last_time
+    last_time = now
+sys.argv = [src_path]
+signal.signal(signal.SIGPROF, sample)
+last_time = time.process_time()
+signal.setitimer(signal.ITIMER_PROF, interval, interval)
+try:
+    runpy.run_path(src_path, run_name='__main__')
+finally:
+    signal.setitimer(signal.ITIMER_PROF, 0)
+    with open(counts_path, 'w') as f:
+        for lineno, seconds in counts.items():
+            f.write(f'{lineno} {seconds}\\n')
+"""
+GROWTH_MODELS = [
+    ('O(log N)', lambda n: math.log2(n + 1)),
+    ('O(N)', lambda n: n),
+    ('O(N log N)', lambda n: n * math.log2(n + 1)),
+    ('O(N^2)', lambda n: n * n),
+    ('O(N^3)', lambda n: n * n * n),
+]
 
 key_size = 32
 iv = '0123456789abcdef'.encode('utf-8')
 
 
+class StateCache:
+    def __init__(self):
+        self.entries = dict()
+        self.lock = threading.Lock()
+
+    def load(self, path, reader):
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+        if entry and entry[0] == stamp:
+            return entry[1]
+        value = reader(path)
+        with self.lock:
+            self.entries[path] = (stamp, value)
+        return value
+
+    def save(self, path, writer, value):
+        writer(path)
+        stat = os.stat(path)
+        with self.lock:
+            self.entries[path] = ((stat.st_mtime_ns, stat.st_size), value)
+
+    def invalidate(self, path=None):
+        with self.lock:
+            if path is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(path, None)
+
+
+state = StateCache()
+
+
+class Tracer:
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+
+    def add(self, name, start, end):
+        event = {
+            'name': name,
+            'ph': 'X',
+            'ts': round((start - self.origin) * 1e6),
+            'dur': round((end - start) * 1e6),
+            'pid': os.getpid(),
+            'tid': threading.get_native_id()
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def summarize(self):
+        summary = dict()
+        for event in self.events:
+            durations = summary.setdefault(event['name'], [])
+            durations.append(event['dur'] / 1000)
+        return summary
+
+    def finish(self):
+        if not self.enabled:
+            return
+        os.makedirs(SAVE_DIR, exist_ok=True)
+        with open(TRACE_JSON_PATH, 'w') as f:
+            json.dump({'traceEvents': self.events,
+                       'displayTimeUnit': 'ms'}, f)
+        print(f"{'phase':<24}{'count':>7}{'total ms':>12}{'mean ms':>10}"
+              f"{'max ms':>10}", file=sys.stderr)
+        summary = sorted(self.summarize().items(),
+                         key=lambda item: -sum(item[1]))
+        for name, durations in summary:
+            print(f"{name:<24}{len(durations):>7}{sum(durations):>12.1f}"
+                  f"{sum(durations) / len(durations):>10.1f}"
+                  f"{max(durations):>10.1f}", file=sys.stderr)
+        print(f"Saved a trace in {TRACE_JSON_PATH}.", file=sys.stderr)
+
+
+tracer = Tracer()
+atexit.register(tracer.finish)
+
+
+def traced(name):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                tracer.add(name, start, time.perf_counter())
+        return wrapper
+    return decorator
+
+
 def randomname(n):
     return ''.join(random.choices(string.ascii_letters + string.digits, k=n))
 
@@ -38,30 +371,41 @@ def hide(code):
     return '*' * len(decrypt(code))
 
 
+def to_key(text):
+    return text.zfill(key_size)[:key_size].encode('utf-8')
+
+
 def save_key():
     key = randomname(key_size)
-    with open(KEY_PATH, 'w') as f:
-        f.write(key)
+
+    def write_key(path):
+        with open(path, 'w') as f:
+            f.write(key)
+    state.save(KEY_PATH, write_key, to_key(key))
+
+
+def read_key(path):
+    with open(path, 'r') as f:
+        return to_key(f.read())
 
 
 def load_key():
     try:
-        with open(KEY_PATH, 'r') as f:
-            key = f.read().zfill(key_size)
-            key = key[:key_size].encode('utf-8')
-            return key
+        return state.load(KEY_PATH, read_key)
     except OSError:
         save_key()
         return load_key()
 
 
 def encrypt(data):
+    from Crypto.Cipher import AES
     aes = AES.new(load_key(), AES.MODE_CFB, iv)
     code = aes.encrypt(data.encode('utf-8'))
     return base64.b64encode(code).decode('utf-8')
 
 
 def decrypt(data):
+    from Crypto.Cipher import AES
     aes = AES.new(load_key(), AES.MODE_CFB, iv)
     return aes.decrypt(base64.b64decode(data)).decode('utf-8')
 
@@ -71,8 +415,10 @@ def save_src_path(src_path=''):
         print("Enter a path to source code.")
         src_path = input().strip('"'' ').replace('\\', '/')
     if os.path.isfile(src_path):
-        with open(SRC_PATH_TXT_PATH, 'w') as f:
-            f.write(src_path)
+        def write_src_path(path):
+            with open(path, 'w') as f:
+                f.write(src_path)
+        state.save(SRC_PATH_TXT_PATH, write_src_path, src_path)
         print("Successfully saved a path to source code in "
               f"{os.path.basename(SRC_PATH_TXT_PATH)}.")
     else:
@@ -80,29 +426,33 @@ def save_src_path(src_path=''):
         save_src_path()
 
 
+def read_src_path(path):
+    with open(path, 'r') as f:
+        return f.read()
+
+
 def load_src_path():
     try:
-        with open(SRC_PATH_TXT_PATH, 'r') as f:
-            return f.read()
+        return state.load(SRC_PATH_TXT_PATH, read_src_path)
     except OSError:
         save_src_path()
         return load_src_path()
 
 
-def get_src_dir():
-    return os.path.dirname(load_src_path())
+def get_src_dir(src_path=None):
+    return os.path.dirname(src_path or load_src_path())
 
 
-def get_src_name():
-    return os.path.basename(load_src_path())
+def get_src_name(src_path=None):
+    return os.path.basename(src_path or load_src_path())
 
 
-def get_src_name_without_ext():
-    return os.path.splitext(get_src_name())[0]
+def get_src_name_without_ext(src_path=None):
+    return os.path.splitext(get_src_name(src_path))[0]
 
 
-def get_src_ext():
-    return os.path.splitext(load_src_path())[-1]
+def get_src_ext(src_path=None):
+    return os.path.splitext(src_path or load_src_path())[-1]
 
 
 def rcv_entered_account_info():
@@ -130,28 +480,82 @@ def load_account_info():
 
 
 def save_session(obj):
-    with open(SESSION_PICKLE_PATH, 'wb') as fp:
-        pickle.dump(obj, fp)
+    def write_session(path):
+        with open(path, 'wb') as fp:
+            pickle.dump(obj, fp)
+    state.save(SESSION_PICKLE_PATH, write_session, obj)
+
+
+def read_session_pickle(path):
+    with open(path, 'rb') as fp:
+        return pickle.load(fp)
 
 
+@traced('load_session')
 def load_session_pickle():
     try:
-        with open(SESSION_PICKLE_PATH, 'rb') as fp:
-            return pickle.load(fp)
+        return state.load(SESSION_PICKLE_PATH, read_session_pickle)
     except OSError:
         login()
         return load_session_pickle()
 
 
+def is_session_expired(ses):
+    now = time.time()
+    cookies = [cookie for cookie in ses.cookies
+               if cookie.name == SESSION_COOKIE_NAME]
+    return not cookies or any(cookie.is_expired(now) for cookie in cookies)
+
+
+session_lock = threading.RLock()
+session_validated = threading.Event()
+
+
+def validate_session():
+    if session_validated.is_set():
+        return
+    with session_lock:
+        if session_validated.is_set():
+            return
+        try:
+            ses = state.load(SESSION_PICKLE_PATH, read_session_pickle)[0]
+        except (OSError, pickle.UnpicklingError, EOFError, ImportError):
+            ses = None
+        if ses is None or is_session_expired(ses):
+            state.invalidate(SESSION_PICKLE_PATH)
+            login()
+        session_validated.set()
+
+
 def load_ses():
+    validate_session()
     return load_session_pickle()[0]
 
 
+def is_login_redirect(r):
+    return r.url.split('?')[0] == LOGIN_URL
+
+
+def renew_session(stale_ses):
+    # The local expiry check cannot see a session revoked on the server, so
+    # a request bounced to the login page logs in again, once per session.
+    with session_lock:
+        if load_session_pickle()[0] is stale_ses:
+            print("The session is no longer valid. Logging in again ...")
+            state.invalidate(SESSION_PICKLE_PATH)
+            login()
+        return load_ses()
+
+
 def load_csrf_token():
+    validate_session()
     return load_session_pickle()[1]
 
 
+@traced('login')
 def login(reset_account=False):
+    import requests
+    from bs4 import BeautifulSoup
 
     account_info = []
     if not reset_account:
@@ -178,16 +582,18 @@ def login(reset_account=False):
         if account_info != load_account_info():
             save_account_info(account_info)
         save_session((ses, csrf_token))
+        session_validated.set()
     else:
         print("Login failed ...")
         login(True)
 
 
 def check(command):
-    check_dict = {'src_path': False, 'account': False}
+    check_dict = {'src_path': False, 'account': False, 'build_cache': False}
     if len(command) == 1:
         check_dict['src_path'] = True
         check_dict['account'] = True
+        check_dict['build_cache'] = True
     elif len(command) >= 2:
         check_dict[command[1]] = True
 
@@ -197,14 +603,111 @@ def check(command):
         account_info = load_account_info()
         account_info['password'] = hide(account_info['password'])
         print(f"Account info : {account_info}")
+    if check_dict['build_cache']:
+        build_cache = load_build_cache()
+        entries = build_cache['entries'].values()
+        size = sum(entry['size'] for entry in entries)
+        print(f"Build cache : {len(entries)} entries ({size // 1024} KB), "
+              f"{build_cache['hits']} hits / {build_cache['misses']} misses")
 
 
-def correct_contest_name(crt_contest_name, new_contest_name):
-    ses = load_ses()
+class CachedResponse:
+    def __init__(self, status_code, text, url, not_modified=False):
+        self.status_code = status_code
+        self.text = text
+        self.url = url
+        self.not_modified = not_modified
+
+
+def get_http_cache_path(url):
+    name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+    return os.path.join(HTTP_CACHE_DIR, f"{name}.json.gz")
+
 
+def load_http_cache(url):
+    try:
+        with gzip.open(get_http_cache_path(url), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError, EOFError):
+        return None
+
+
+def save_http_cache(url, entry):
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    cache_path = get_http_cache_path(url)
+    temp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+        json.dump(entry, f)
+    os.replace(temp_path, cache_path)
+    evict_http_cache()
+
+
+def evict_http_cache():
+    entries = []
+    for name in os.listdir(HTTP_CACHE_DIR):
+        try:
+            stat = os.stat(os.path.join(HTTP_CACHE_DIR, name))
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, name))
+    total_size = sum(size for _, size, _ in entries)
+    now = time.time()
+    for mtime, size, name in sorted(entries):
+        if (total_size <= HTTP_CACHE_SIZE_LIMIT
+           and now - mtime <= HTTP_CACHE_MAX_AGE):
+            break
+        try:
+            os.remove(os.path.join(HTTP_CACHE_DIR, name))
+        except OSError:
+            pass
+        total_size -= size
+
+
+@traced('http_get')
+def cached_get(ses, url, force=False, limiter=None):
+    entry = None if force else load_http_cache(url)
+    if entry and time.time() - entry['time'] <= HTTP_CACHE_TTL:
+        os.utime(get_http_cache_path(url))
+        return CachedResponse(200, entry['body'], entry['url'], True)
+
+    headers = dict()
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last modified'):
+        headers['If-Modified-Since'] = entry['last modified']
+    if limiter is not None:
+        limiter.wait()
+    r = ses.get(url, headers=headers)
+    if is_login_redirect(r) and url != LOGIN_URL:
+        ses = renew_session(ses)
+        r = ses.get(url, headers=headers)
+    if r.status_code == 304 and entry:
+        entry['time'] = time.time()
+        save_http_cache(url, entry)
+        return CachedResponse(200, entry['body'], entry['url'], True)
+    # A redirected response (e.g. to the login page) is not the page that
+    # was asked for, so it must not be replayed from the cache.
+    if r.status_code == 200 and r.url == url:
+        save_http_cache(url, {
+            'url': r.url,
+            'etag': r.headers.get('ETag'),
+            'last modified': r.headers.get('Last-Modified'),
+            'time': time.time(),
+            'body': r.text
+        })
+    return CachedResponse(r.status_code, r.text, r.url)
+
+
+@traced('correct_contest_name')
+def correct_contest_name(crt_contest_name, new_contest_name):
     new_contest_name = new_contest_name.lower()
+    if load_contest_metadata(new_contest_name):
+        print("The contest name has been updated!")
+        return new_contest_name
+
+    ses = load_ses()
     contest_url = urljoin(BASE_URL, f"contests/{new_contest_name}")
-    r = ses.get(contest_url)
+    r = cached_get(ses, contest_url)
     if r.status_code == 200:
         print("The contest name has been updated!")
         return new_contest_name
@@ -266,16 +769,126 @@ def update_testcase(command, contest_name, task_number, testcase_number):
     return contest_name, task_number, testcase_number
 
 
-def download_all_testcases(contest_name, redownload=False):
-    testcases_path = f"{TESTCASES_DIR}/{contest_name}.json"
+class RateLimiter:
+    # A token bucket: up to `burst` requests go out at once, after which
+    # they are spaced out to `rate` per second.
+    def __init__(self, rate, burst=1):
+        self.interval = 1 / rate
+        self.burst = burst
+        self.tokens = burst
+        self.last_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens
+                              + (now - self.last_time) / self.interval)
+            self.last_time = now
+            self.tokens -= 1
+            wait_time = -self.tokens * self.interval
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+def make_shared_ses(jobs):
+    from requests.adapters import HTTPAdapter
+    ses = load_ses()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=jobs)
+    ses.mount('https://', adapter)
+    ses.mount('http://', adapter)
+    return ses
+
+
+def fetch_contest_start_time(contest_name):
+    from bs4 import BeautifulSoup
+    ses = load_ses()
+    r = ses.get(urljoin(BASE_URL, f"contests/{contest_name}"))
+    if r.status_code != 200:
+        return None
+    soup = BeautifulSoup(r.text, 'lxml')
+    time_tag = soup.find('time', class_='fixtime-full')
+    if not time_tag:
+        return None
+    try:
+        return datetime.strptime(time_tag.text.strip(), '%Y-%m-%d %H:%M:%S%z')
+    except ValueError:
+        return None
+
+
+def has_tasks(contest_name):
+    ses = load_ses()
+    r = ses.get(urljoin(BASE_URL, f"contests/{contest_name}/tasks"))
+    return (r.status_code == 200
+            and re.search(r'/contests/[^/]+/tasks/', r.text) is not None)
+
+
+def prefetch_testcases(contest_name, cancel):
+    import requests
+    start_time = fetch_contest_start_time(contest_name)
+    if start_time is None:
+        print(f"Failed in fetching the start time of {contest_name} ...")
+        return
+    wait_time = (start_time - datetime.now(timezone.utc)).total_seconds()
+    if wait_time > 0:
+        print(f"Testcases for {contest_name} will be downloaded at "
+              f"{start_time.astimezone():%Y-%m-%d %H:%M:%S}.")
+        if cancel.wait(wait_time):
+            return
+
+    interval = PREFETCH_INTERVAL
+    while not cancel.is_set():
+        try:
+            if has_tasks(contest_name):
+                download_all_testcases(contest_name, True)
+                return
+        except requests.RequestException:
+            pass
+        if cancel.wait(interval * random.uniform(0.5, 1.5)):
+            return
+        interval = min(interval * 2, PREFETCH_MAX_INTERVAL)
+
+
+prefetchers = dict()
+
 
-    if os.path.exists(testcases_path) and not redownload:
+def start_prefetch(contest_name):
+    cancel_prefetch(contest_name)
+    cancel = threading.Event()
+    thread = threading.Thread(target=prefetch_testcases,
+                              args=(contest_name, cancel), daemon=True)
+    prefetchers[contest_name] = (thread, cancel)
+    thread.start()
+
+
+def cancel_prefetch(contest_name=None):
+    for name in list(prefetchers):
+        if contest_name is None or name == contest_name:
+            thread, cancel = prefetchers.pop(name)
+            if thread.is_alive():
+                cancel.set()
+                print(f"Cancelled prefetching testcases for {name}.")
+
+
+@traced('download_all_testcases')
+def download_all_testcases(contest_name, redownload=False,
+                           jobs=DOWNLOAD_JOBS, force=False, limiter=None,
+                           rate=DOWNLOAD_RATE):
+    tasks = load_index(contest_name)['tasks']
+    if tasks and not redownload:
         print(f"Testcases for {contest_name} are already downloaded.")
         return True
+    elif not redownload and restore_mirror(contest_name):
+        print(f"Restored testcases for {contest_name} from the mirror.")
+        return True
     else:
-        ses = load_ses()
+        from bs4 import BeautifulSoup
+        ses = make_shared_ses(jobs)
+        if limiter is None:
+            limiter = RateLimiter(rate, jobs)
 
-        r = ses.get(urljoin(BASE_URL, f"contests/{contest_name}/tasks"))
+        tasks_url = urljoin(BASE_URL, f"contests/{contest_name}/tasks")
+        r = cached_get(ses, tasks_url, force, limiter)
         if r.status_code != 200:
             print(f"Failed in downloading testcases for {contest_name} ...")
             return False
@@ -290,124 +903,813 @@ def download_all_testcases(contest_name, redownload=False):
             sec_tds = soup.find_all('td', string=re.compile(r' sec$'))
             secs = [sec.text for sec in sec_tds]
             time_limit_list = [float(sec.replace(' sec', '')) for sec in secs]
-
-            testcases_dict = dict()
-            for (i, task_url) in enumerate(task_url_list):
-                testcases = download_testcases(task_url)
-                testcases['info']['time limit'] = time_limit_list[i]
-                testcases_dict[f'task {i}'] = testcases
-
-            with open(testcases_path, 'w') as f:
-                json.dump(testcases_dict, f, indent=4)
+            mb_tds = soup.find_all('td', string=re.compile(r' Mi?B$'))
+            memory_limit_list = [float(mb.text.split()[0]) for mb in mb_tds]
+
+            os.makedirs(get_testcases_dir(contest_name), exist_ok=True)
+            metadata = {
+                'task screen names': [os.path.basename(task_url)
+                                      for task_url in task_url_list],
+                'time limits': time_limit_list,
+                'memory limits': memory_limit_list
+            }
+            save_contest_metadata(contest_name, metadata)
+            pending = list(range(len(task_url_list)))
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                languages = None
+                for retry in range(DOWNLOAD_RETRY):
+                    if retry:
+                        time.sleep(DOWNLOAD_RETRY_INTERVAL * 2 ** retry)
+                    futures = [executor.submit(download_testcases,
+                                               task_url_list[i], ses, limiter,
+                                               force, f'task {i}' in tasks)
+                               for i in pending]
+                    # Queued behind the task pages, which matter first at
+                    # contest start; only submit needs the languages.
+                    if languages is None:
+                        languages = executor.submit(fetch_languages, ses,
+                                                    contest_name, force,
+                                                    limiter)
+                    results = [future.result() for future in futures]
+                    failed = []
+                    for i, testcases in zip(pending, results):
+                        if testcases is UNCHANGED:
+                            continue
+                        if testcases:
+                            if i < len(time_limit_list):
+                                testcases['info']['time limit'] = \
+                                    time_limit_list[i]
+                            if i < len(memory_limit_list):
+                                testcases['info']['memory limit'] = \
+                                    memory_limit_list[i]
+                            save_task_testcases(contest_name, f'task {i}',
+                                                testcases)
+                        else:
+                            failed.append(i)
+                    pending = failed
+                    if not pending:
+                        break
+                metadata['languages'] = languages.result()
+            save_contest_metadata(contest_name, metadata)
+
+            if pending:
+                task_names = [os.path.basename(task_url_list[i])
+                              for i in pending]
+                print(f"Failed in downloading testcases for "
+                      f"{', '.join(task_names)} ...")
 
             print(f"Finished downloading testcases for {contest_name}.")
             return True
 
 
-def download_testcases(task_url):
+@traced('download_testcases')
+def download_testcases(task_url, ses=None, limiter=None, force=False,
+                       reuse=False):
+    import requests
     task_full_name = os.path.basename(task_url)
     print(f"Downloading testcases for {task_full_name} ...")
 
-    ses = load_ses()
+    if ses is None:
+        ses = load_ses()
 
-    r = ses.get(task_url)
+    try:
+        r = cached_get(ses, task_url, force, limiter)
+    except requests.RequestException:
+        print(f"Failed in downloading testcases for {task_full_name} ...")
+        return dict()
     if r.status_code != 200:
         print(f"Failed in downloading testcases for {task_full_name} ...")
         return dict()
+    elif r.not_modified and reuse:
+        return UNCHANGED
     else:
-        soup = BeautifulSoup(r.text, 'lxml')
-        soup_ja = soup.find('span', class_='lang-ja')
-        soup = soup_ja if soup_ja else soup
-        divs = soup.find_all(re.compile("div|section"))
-
-        input_list = []
-        output_list = []
-        for div in divs:
-            h = div.find(re.compile("h[0-9]"), recursive=False)
-            pre = div.find('pre')
-            if h and pre and h.string:
-                if '入力例' in h.string:
-                    input_list.append(pre.string if pre.string else "")
-                if '出力例' in h.string:
-                    output_list.append(pre.string if pre.string else "")
-
-        testcases = dict()
-        testcases['info'] = dict()
-        paragraphs = soup.find_all(re.compile("p|section"))
-        maximum_error_paragraph = [p for p in paragraphs if '誤差' in p.text]
-        maximum_error = 0
-        if maximum_error_paragraph:
-            variables = maximum_error_paragraph[0].find_all('var')
-            var_texts = [var.text for var in variables]
-            pow_errors = [re.search(r'10\^{.*?}', var) for var in var_texts]
-            pow_errors = [match for match in pow_errors if match]
-            exp_errors = [re.search(r'1e.[0-9]+', var) for var in var_texts]
-            exp_errors = [match for match in exp_errors if match]
-            if pow_errors:
-                error_exponent = int(pow_errors[-1].group()[5:-1]) * (-1)
-                maximum_error = pow(10, error_exponent)
-            elif exp_errors:
-                error_exponent = int(exp_errors[-1].group()[3:]) * (-1)
-                maximum_error = pow(10, error_exponent)
-            else:
-                for var in var_texts:
-                    if is_float(var):
-                        var = float(var)
-                        if not var.is_integer():
-                            maximum_error = var
-        testcases['info']["maximum error"] = maximum_error
+        return parse_task_page_fast(r.text)
+
+
+def parse_maximum_error(var_texts):
+    maximum_error = 0
+    pow_errors = [re.search(r'10\^{.*?}', var) for var in var_texts]
+    pow_errors = [match for match in pow_errors if match]
+    exp_errors = [re.search(r'1e.[0-9]+', var) for var in var_texts]
+    exp_errors = [match for match in exp_errors if match]
+    if pow_errors:
+        error_exponent = int(pow_errors[-1].group()[5:-1]) * (-1)
+        maximum_error = pow(10, error_exponent)
+    elif exp_errors:
+        error_exponent = int(exp_errors[-1].group()[3:]) * (-1)
+        maximum_error = pow(10, error_exponent)
+    else:
+        for var in var_texts:
+            if is_float(var):
+                var = float(var)
+                if not var.is_integer():
+                    maximum_error = var
+    return maximum_error
+
+
+def strip_pre_newline(text):
+    # A newline right after <pre> is not part of the content (old pages
+    # write <pre class="prettyprint linenums">\n...), but neither
+    # lxml nor HTMLParser drops it.
+    return text[1:] if text.startswith('\n') else text
+
+
+def make_testcases(html, input_list, output_list, constraint_texts,
+                   error_var_texts):
+    testcases = dict()
+    testcases['info'] = dict()
+    testcases['info']["maximum error"] = parse_maximum_error(error_var_texts)
+    testcases['info']["constraints"] = parse_constraints(constraint_texts)
+    time_limit = TIME_LIMIT_RE.search(html)
+    if time_limit:
+        testcases['info']["time limit"] = float(time_limit.group(1))
+    memory_limit = MEMORY_LIMIT_RE.search(html)
+    if memory_limit:
+        testcases['info']["memory limit"] = float(memory_limit.group(1))
+
+    for i, (testcase_input, testcase_output)\
+            in enumerate(zip(input_list, output_list)):
+        testcase = {'input': strip_pre_newline(testcase_input),
+                    'output': strip_pre_newline(testcase_output)}
+        testcases[f'testcase {i + 1}'] = testcase
+
+    return testcases
+
+
+def parse_task_page(html):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'lxml')
+    soup_ja = soup.find('span', class_='lang-ja')
+    soup = soup_ja if soup_ja else soup
+    divs = soup.find_all(DIV_RE)
+
+    input_list = []
+    output_list = []
+    constraint_texts = []
+    for div in divs:
+        h = div.find(HEADING_RE, recursive=False)
+        h_text = h.get_text() if h else None
+        pre = div.find('pre')
+        if h_text and '制約' in h_text and not constraint_texts:
+            constraint_texts = [var.text for var in div.find_all('var')]
+        if h_text and pre:
+            if '入力例' in h_text:
+                input_list.append(pre.string if pre.string else "")
+            if '出力例' in h_text:
+                output_list.append(pre.string if pre.string else "")
+
+    paragraphs = soup.find_all(PARAGRAPH_RE)
+    maximum_error_paragraph = [p for p in paragraphs if '誤差' in p.text]
+    error_var_texts = []
+    if maximum_error_paragraph:
+        variables = maximum_error_paragraph[0].find_all('var')
+        error_var_texts = [var.text for var in variables]
+
+    return make_testcases(html, input_list, output_list, constraint_texts,
+                          error_var_texts)
+
+
+class StopParsing(Exception):
+    pass
+
+
+class TaskPageNode:
+    def __init__(self, name, index, keep_text):
+        self.name = name
+        self.index = index
+        self.texts = [] if keep_text else None
+        self.child_count = 0
+        self.only_child = None
+        self.heading = None
+        self.pre = None
+        self.vars = []
+
+    @property
+    def string(self):
+        if self.child_count != 1:
+            return None
+        if isinstance(self.only_child, str):
+            return self.only_child
+        return self.only_child.string
+
+
+class TaskPageParser(HTMLParser):
+    def __init__(self, scoped):
+        super().__init__()
+        self.scoped = scoped
+        self.stack = []
+        self.nodes = []
+        self.found_scope = not scoped
+
+    def add_child(self, child):
+        if self.stack:
+            parent = self.stack[-1]
+            parent.child_count += 1
+            parent.only_child = child
+
+    def handle_starttag(self, tag, attrs):
+        if not self.found_scope:
+            if tag == 'span' and 'lang-ja' in (dict(attrs).get('class')
+                                               or '').split():
+                self.found_scope = True
+                self.stack.append(TaskPageNode(tag, -1, False))
+            return
+        if not self.stack and self.scoped:
+            return
+
+        if tag in IMPLIED_P_END_TAGS:
+            self.close_implied('p', IMPLIED_END_SCOPE)
+        elif tag == 'li':
+            self.close_implied('li', ('ul', 'ol'))
+
+        node = TaskPageNode(tag, len(self.nodes),
+                            tag == 'var' or PARAGRAPH_RE.search(tag)
+                            or HEADING_RE.search(tag))
+        self.nodes.append(node)
+        self.add_child(node)
+        if self.stack:
+            parent = self.stack[-1]
+            if parent.heading is None and HEADING_RE.search(tag):
+                parent.heading = node
+            if tag == 'pre':
+                for ancestor in self.stack:
+                    if ancestor.pre is None:
+                        ancestor.pre = node
+        if tag not in VOID_TAGS:
+            self.stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def close_implied(self, tag, boundaries):
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].name == tag:
+                while len(self.stack) > i:
+                    self.pop()
+                return
+            if self.stack[i].name in boundaries:
+                return
+
+    def pop(self):
+        node = self.stack.pop()
+        if node.name == 'var':
+            text = ''.join(node.texts)
+            for ancestor in self.stack:
+                ancestor.vars.append(text)
+        if not self.stack and self.scoped:
+            raise StopParsing()
+
+    def handle_endtag(self, tag):
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i].name == tag:
+                while len(self.stack) > i:
+                    self.pop()
+                return
+
+    def handle_data(self, data):
+        if not self.stack:
+            return
+        self.add_child(data)
+        for node in self.stack:
+            if node.texts is not None:
+                node.texts.append(data)
+
+    def handle_comment(self, data):
+        self.add_child(data)
+
+
+@traced('parse_task_page')
+def parse_task_page_fast(html):
+    html = html.replace('\r\n', '\n').replace('\r', '\n')
+    match = LANG_JA_SPAN_RE.search(html)
+    parser = TaskPageParser(match is not None)
+    try:
+        parser.feed(html[match.start():] if match else html)
+        parser.close()
+    except StopParsing:
+        pass
+
+    input_list = []
+    output_list = []
+    constraint_texts = []
+    for div in parser.nodes:
+        if not DIV_RE.search(div.name):
+            continue
+        h = div.heading
+        h_text = ''.join(h.texts) if h else None
+        if h_text and '制約' in h_text and not constraint_texts:
+            constraint_texts = div.vars
+        if h_text and div.pre:
+            pre_string = div.pre.string
+            if '入力例' in h_text:
+                input_list.append(pre_string if pre_string else "")
+            if '出力例' in h_text:
+                output_list.append(pre_string if pre_string else "")
+
+    error_var_texts = []
+    for paragraph in parser.nodes:
+        if (paragraph.texts is not None and PARAGRAPH_RE.search(paragraph.name)
+           and '誤差' in ''.join(paragraph.texts)):
+            error_var_texts = paragraph.vars
+            break
+
+    return make_testcases(html, input_list, output_list, constraint_texts,
+                          error_var_texts)
+
+
+def parse_number(text):
+    text = text.replace(',', '').replace('{', '').replace('}', '')
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)?\s*(?:\\times|\\cdot)?'
+                         r'\s*(?:10\s*\^\s*(\d+))?\s*', text)
+    if not match or not any(match.groups()):
+        return None
+    mantissa = float(match.group(1)) if match.group(1) else 1
+    exponent = int(match.group(2)) if match.group(2) else 0
+    return round(mantissa * pow(10, exponent))
+
+
+def parse_constraints(constraint_texts):
+    constraints = dict()
+    for text in constraint_texts:
+        parts = re.split(r'\\leqq|\\leq?|≤|<', text)
+        if len(parts) < 2:
+            continue
+        upper_bound = parse_number(parts[-1])
+        if upper_bound is None:
+            continue
+        for name in parts[-2].split(','):
+            name = name.strip()
+            if re.fullmatch(r'[A-Za-z](_\{?[A-Za-z0-9,]+\}?)?', name):
+                constraints.setdefault(name, upper_bound)
+    return constraints
 
-        for i, (testcase_input, testcase_output)\
-                in enumerate(zip(input_list, output_list)):
-            testcase = {'input': testcase_input, 'output': testcase_output}
-            testcases[f'testcase {i + 1}'] = testcase
 
-        return testcases
+def get_testcases_dir(contest_name):
+    return os.path.join(TESTCASES_DIR, contest_name)
 
 
-def load_testcases(contest_name, task_number):
-    testcases_path = f"{TESTCASES_DIR}/{contest_name}.json"
+def get_index_path(contest_name):
+    return os.path.join(get_testcases_dir(contest_name), "index.json")
+
+
+def get_task_dir(contest_name, task_key):
+    return os.path.join(get_testcases_dir(contest_name), task_key.split()[-1])
+
+
+def save_index(contest_name, index):
+    index_path = get_index_path(contest_name)
+    with open(index_path + '.tmp', 'w') as f:
+        json.dump(index, f, indent=4)
+    os.replace(index_path + '.tmp', index_path)
+
+
+def migrate_testcases(contest_name):
+    legacy_path = f"{TESTCASES_DIR}/{contest_name}.json"
     try:
-        with open(testcases_path, 'r') as f:
+        with open(legacy_path, 'r') as f:
             testcases_dict = json.load(f)
-        return testcases_dict.get(f'task {task_number}', dict())
-    except OSError:
+    except (OSError, ValueError):
+        return
+    os.makedirs(get_testcases_dir(contest_name), exist_ok=True)
+    save_index(contest_name, {'tasks': dict()})
+    for task_key, testcases in testcases_dict.items():
+        save_task_testcases(contest_name, task_key, testcases)
+    os.remove(legacy_path)
+    print(f"Migrated testcases for {contest_name} to the indexed format.")
+
+
+def load_index(contest_name):
+    if not os.path.exists(get_index_path(contest_name)):
+        migrate_testcases(contest_name)
+    try:
+        with open(get_index_path(contest_name), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'tasks': dict()}
+
+
+def save_contest_metadata(contest_name, metadata):
+    index = load_index(contest_name)
+    index['contest'] = metadata
+    save_index(contest_name, index)
+
+
+def load_contest_metadata(contest_name):
+    if not os.path.exists(get_index_path(contest_name)):
         return dict()
+    return load_index(contest_name).get('contest', dict())
 
 
-def get_build_command():
-    ext = get_src_ext()
+def fetch_languages(ses, contest_name, force=False, limiter=None):
+    from bs4 import BeautifulSoup
+    submit_url = urljoin(BASE_URL, f"contests/{contest_name}/submit")
+    r = cached_get(ses, submit_url, force, limiter)
+    if r.status_code != 200:
+        return dict()
+    soup = BeautifulSoup(r.text, 'lxml')
+    select = soup.find('select', attrs={'name': 'data.LanguageId'})
+    if not select:
+        return dict()
+    return {option.get('value'): option.text.strip()
+            for option in select.find_all('option') if option.get('value')}
+
+
+def get_mirror_path(contest_name):
+    return os.path.join(MIRROR_DIR, f"{contest_name}.json.gz")
+
+
+def is_download_complete(contest_name):
+    index = load_index(contest_name)
+    task_screen_names = index.get('contest', dict()).get('task screen names')
+    return bool(task_screen_names) \
+        and len(index['tasks']) == len(task_screen_names)
+
+
+def pack_mirror(contest_name):
+    index = load_index(contest_name)
+    tasks = dict()
+    for task_key in index['tasks']:
+        task_number = int(task_key.split()[-1])
+        testcases = load_testcases(contest_name, task_number)
+        tasks[task_key] = {'info': testcases['info']}
+        for key, testcase in testcases.items():
+            if key == 'info':
+                continue
+            tasks[task_key][key] = {
+                kind: bytes(map_testcase(testcase, kind)).decode('utf-8')
+                for kind in ('input', 'output')}
+    os.makedirs(MIRROR_DIR, exist_ok=True)
+    mirror_path = get_mirror_path(contest_name)
+    with gzip.open(mirror_path + '.tmp', 'wt', encoding='utf-8') as f:
+        json.dump({'contest': index.get('contest', dict()), 'tasks': tasks},
+                  f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(mirror_path + '.tmp', mirror_path)
+
+
+def restore_mirror(contest_name):
+    try:
+        with gzip.open(get_mirror_path(contest_name), 'rt',
+                       encoding='utf-8') as f:
+            mirror = json.load(f)
+    except (OSError, ValueError, EOFError):
+        return False
+    os.makedirs(get_testcases_dir(contest_name), exist_ok=True)
+    save_contest_metadata(contest_name, mirror['contest'])
+    for task_key, testcases in mirror['tasks'].items():
+        save_task_testcases(contest_name, task_key, testcases)
+    return True
+
+
+def parse_contest_names(specs):
+    contest_names = []
+    for spec in specs:
+        match = re.fullmatch(r'([a-z]+)([0-9]+)-(?:[a-z]+)?([0-9]+)',
+                             spec.lower())
+        if match:
+            series, first, last = match.groups()
+            contest_names.extend(f"{series}{number:0{len(first)}d}"
+                                 for number in range(int(first),
+                                                     int(last) + 1))
+        else:
+            contest_names.append(spec.lower())
+    return contest_names
+
+
+def mirror_contests(contest_names, jobs=DOWNLOAD_JOBS, rate=DOWNLOAD_RATE):
+    limiter = RateLimiter(rate, jobs)
+    completed = 0
+    failed = []
+    try:
+        for i, contest_name in enumerate(contest_names):
+            if os.path.exists(get_mirror_path(contest_name)):
+                completed += 1
+                continue
+            print(f"[{i + 1}/{len(contest_names)}] Mirroring "
+                  f"{contest_name} ...")
+            downloaded = bool(load_index(contest_name)['tasks'])
+            if not is_download_complete(contest_name):
+                download_all_testcases(contest_name, True, jobs,
+                                       limiter=limiter)
+            if is_download_complete(contest_name):
+                pack_mirror(contest_name)
+                if not downloaded:
+                    shutil.rmtree(get_testcases_dir(contest_name),
+                                  ignore_errors=True)
+                completed += 1
+            else:
+                failed.append(contest_name)
+    except KeyboardInterrupt:
+        print("Interrupted. Run the same mirror command again to resume.")
+    print(f"Mirrored {completed}/{len(contest_names)} contests "
+          f"in {MIRROR_DIR}.")
+    if failed:
+        print(f"Failed in mirroring {', '.join(failed)} ...")
+
+
+def save_task_testcases(contest_name, task_key, testcases):
+    task_dir = get_task_dir(contest_name, task_key)
+    shutil.rmtree(task_dir, ignore_errors=True)
+    os.makedirs(task_dir)
+
+    testcase_keys = []
+    for key, testcase in testcases.items():
+        if key == 'info':
+            continue
+        for kind, ext in (('input', 'in'), ('output', 'out')):
+            path = os.path.join(task_dir, f"{key.split()[-1]}.{ext}")
+            with open(path, 'wb') as f:
+                f.write(testcase[kind].encode('utf-8'))
+        testcase_keys.append(key)
+
+    index = load_index(contest_name)
+    index['tasks'][task_key] = {
+        'info': testcases.get('info', dict()),
+        'testcases': testcase_keys
+    }
+    index['tasks'] = dict(sorted(index['tasks'].items(),
+                                 key=lambda x: int(x[0].split()[-1])))
+    save_index(contest_name, index)
+
+
+@traced('load_testcases')
+def load_testcases(contest_name, task_number):
+    task_key = f'task {task_number}'
+    task = load_index(contest_name)['tasks'].get(task_key)
+    if task is None:
+        return dict()
+    task_dir = get_task_dir(contest_name, task_key)
+    testcases = {'info': task['info']}
+    for key in task['testcases']:
+        testcases[key] = {
+            'input path': os.path.join(task_dir, f"{key.split()[-1]}.in"),
+            'output path': os.path.join(task_dir, f"{key.split()[-1]}.out")
+        }
+    return testcases
+
+
+def map_testcase(testcase, kind):
+    if kind in testcase:
+        return testcase[kind].encode('utf-8')
+    with open(testcase[f'{kind} path'], 'rb') as f:
+        if os.fstat(f.fileno()).st_size < MMAP_THRESHOLD:
+            return f.read()
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def preview_testcase(testcase, kind):
+    if kind in testcase:
+        return omit_error_message(testcase[kind])
+    with open(testcase[f'{kind} path'], 'rb') as f:
+        head = f.read(1001)
+    return omit_error_message(head.decode('utf-8', 'replace'))
+
+
+def get_build_command(src_path=None):
+    ext = get_src_ext(src_path)
     if ext == '.java':
-        return ['javac', get_src_name()]
+        return ['javac', get_src_name(src_path)]
     elif ext == '.cpp':
-        return ['g++', get_src_name(), '-Wall', '-std=gnu++14',
-                '-o', f"{get_src_name_without_ext()}.exe"]
+        cpp_flags = load_cpp_flags()
+        return ['g++', get_src_name(src_path), *cpp_flags,
+                '-I', os.path.abspath(get_pch_dir(cpp_flags)),
+                '-o', f"{get_src_name_without_ext(src_path)}.exe"]
     elif ext == '.py':
-        return ['python', '-m', 'py_compile', get_src_name()]
+        return ['python', '-m', 'py_compile', get_src_name(src_path)]
     else:
         return []
 
 
-def build():
-    print("Building ...")
-    result = subprocess.run(get_build_command(),
-                            cwd=get_src_dir(),
+def save_cpp_flags(cpp_flags):
+    def write_cpp_flags(path):
+        with open(path, 'w') as f:
+            f.write(' '.join(cpp_flags))
+    state.save(CPP_FLAGS_TXT_PATH, write_cpp_flags, cpp_flags)
+    print("Successfully saved C++ compiler flags in "
+          f"{os.path.basename(CPP_FLAGS_TXT_PATH)}.")
+
+
+def read_cpp_flags(path):
+    with open(path, 'r') as f:
+        return f.read().split()
+
+
+def load_cpp_flags():
+    try:
+        return state.load(CPP_FLAGS_TXT_PATH, read_cpp_flags)
+    except OSError:
+        return DEFAULT_CPP_FLAGS
+
+
+def get_pch_dir(cpp_flags):
+    key_source = '\0'.join([get_compiler_version('g++'), *cpp_flags])
+    key = hashlib.sha256(key_source.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(PCH_DIR, key)
+
+
+pch_lock = threading.Lock()
+
+
+def prepare_pch(src_path=None):
+    try:
+        with open(src_path or load_src_path(), 'r', errors='replace') as f:
+            if PCH_HEADER not in f.read():
+                return
+    except OSError:
+        return
+    with pch_lock:
+        build_pch(load_cpp_flags())
+
+
+def build_pch(cpp_flags):
+    pch_dir = get_pch_dir(cpp_flags)
+    pch_path = os.path.join(pch_dir, f"{PCH_HEADER}.gch")
+    if os.path.exists(pch_path):
+        return
+
+    if os.path.isdir(PCH_DIR):
+        for name in os.listdir(PCH_DIR):
+            shutil.rmtree(os.path.join(PCH_DIR, name), ignore_errors=True)
+    os.makedirs(os.path.dirname(pch_path), exist_ok=True)
+    print(f"Precompiling {PCH_HEADER} ...")
+    start_time = time.monotonic()
+    wrapper_path = os.path.join(pch_dir, "pch.h")
+    with open(wrapper_path, 'w') as f:
+        f.write(f"#include <{PCH_HEADER}>\n")
+    tmp_path = f"{pch_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    result = subprocess.run(['g++', *cpp_flags, '-x', 'c++-header',
+                             wrapper_path, '-o', tmp_path],
                             stderr=subprocess.PIPE)
-    error_message = result.stderr.decode('cp932')
+    if result.returncode == 0:
+        os.replace(tmp_path, pch_path)
+        print(f"Precompiled {PCH_HEADER} in "
+              f"{time.monotonic() - start_time:.2f} s.")
+    else:
+        print(f"Failed in precompiling {PCH_HEADER} ...")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def get_src_hash(src_path=None):
+    try:
+        with open(src_path or load_src_path(), 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return ''
+
+
+compiler_versions = dict()
+
+
+def get_compiler_version(compiler):
+    if compiler not in compiler_versions:
+        option = '-version' if compiler == 'javac' else '--version'
+        try:
+            result = subprocess.run([compiler, option],
+                                    stdout=subprocess.PIPE,
+                                    stderr=subprocess.STDOUT)
+            compiler_versions[compiler] = result.stdout.decode('cp932',
+                                                               'replace')
+        except OSError:
+            compiler_versions[compiler] = ''
+    return compiler_versions[compiler]
+
+
+def get_build_key(build_command, src_path=None):
+    src_hash = get_src_hash(src_path)
+    if not build_command or not src_hash:
+        return ''
+    compiler_version = get_compiler_version(build_command[0])
+    key_source = '\0'.join([src_hash, *build_command, compiler_version])
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+
+def get_build_artifacts(start_time, src_path=None):
+    ext = get_src_ext(src_path)
+    src_dir = get_src_dir(src_path)
+    if ext == '.java':
+        class_files = [name for name in os.listdir(src_dir or '.')
+                       if name.endswith('.class')]
+        return [name for name in class_files
+                if os.path.getmtime(os.path.join(src_dir, name)) >= start_time]
+    elif ext == '.cpp':
+        return [f"{get_src_name_without_ext(src_path)}.exe"]
+    else:
+        return []
+
+
+def load_build_cache():
+    try:
+        with open(BUILD_CACHE_JSON_PATH, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'hits': 0, 'misses': 0, 'entries': dict()}
+
+
+def save_build_cache(build_cache):
+    if not os.path.exists(BUILD_CACHE_DIR):
+        os.mkdir(BUILD_CACHE_DIR)
+    with open(BUILD_CACHE_JSON_PATH + '.tmp', 'w') as f:
+        json.dump(build_cache, f, indent=4)
+    os.replace(BUILD_CACHE_JSON_PATH + '.tmp', BUILD_CACHE_JSON_PATH)
+
+
+build_cache_lock = threading.Lock()
+
+
+def restore_build_artifacts(key, entry, src_path=None):
+    src_dir = get_src_dir(src_path)
+    for name in entry['files']:
+        cached_path = os.path.join(BUILD_CACHE_DIR, key, name)
+        dst_path = os.path.join(src_dir, name)
+        if not os.path.isfile(cached_path):
+            return False
+        if (os.path.isfile(dst_path)
+           and os.path.getsize(dst_path) == os.path.getsize(cached_path)
+           and os.path.getmtime(dst_path) == os.path.getmtime(cached_path)):
+            continue
+        shutil.copy2(cached_path, dst_path)
+    return True
+
+
+def store_build_artifacts(build_cache, key, files, src_path=None):
+    src_dir = get_src_dir(src_path)
+    entry_dir = os.path.join(BUILD_CACHE_DIR, key)
+    os.makedirs(entry_dir, exist_ok=True)
+    size = 0
+    for name in files:
+        artifact_path = os.path.join(src_dir, name)
+        if os.path.isfile(artifact_path):
+            shutil.copy2(artifact_path, os.path.join(entry_dir, name))
+            size += os.path.getsize(artifact_path)
+    build_cache['entries'][key] = {
+        'files': files, 'size': size, 'last used': time.time()}
+
+    entries = build_cache['entries']
+    total_size = sum(entry['size'] for entry in entries.values())
+    for old_key in sorted(entries, key=lambda k: entries[k]['last used']):
+        if total_size <= BUILD_CACHE_SIZE_LIMIT or old_key == key:
+            break
+        total_size -= entries[old_key]['size']
+        del entries[old_key]
+        shutil.rmtree(os.path.join(BUILD_CACHE_DIR, old_key),
+                      ignore_errors=True)
+
+
+@traced('build')
+def build(src_path=None, cancel=None):
+    build_command = get_build_command(src_path)
+    key = get_build_key(build_command, src_path)
+    with build_cache_lock:
+        build_cache = load_build_cache()
+        entry = build_cache['entries'].get(key)
+        if entry and restore_build_artifacts(key, entry, src_path):
+            print("Build cache hit!")
+            build_cache['hits'] += 1
+            entry['last used'] = time.time()
+            save_build_cache(build_cache)
+            return True
+
+    if get_src_ext(src_path) == '.cpp':
+        prepare_pch(src_path)
+    print("Building ...")
+    start_time = time.time()
+    process = subprocess.Popen(build_command,
+                               cwd=get_src_dir(src_path),
+                               stderr=subprocess.PIPE)
+    if cancel:
+        cancel.register(process)
+    _, stderr = process.communicate()
+    if cancel:
+        cancel.unregister(process)
+        if cancel.is_set():
+            return False
+    error_message = stderr.decode('cp932')
+    print(f"Build time : {time.time() - start_time:.2f} s")
     if error_message:
         print("Compilation error : ")
         print(error_message)
+    elif key:
+        with build_cache_lock:
+            build_cache = load_build_cache()
+            build_cache['misses'] += 1
+            store_build_artifacts(build_cache, key,
+                                  get_build_artifacts(start_time - 1,
+                                                      src_path),
+                                  src_path)
+            save_build_cache(build_cache)
     return not error_message
 
 
-def get_run_command():
-    ext = get_src_ext()
+def get_run_command(src_path=None):
+    ext = get_src_ext(src_path)
     if ext == '.java':
-        return ['java', get_src_name_without_ext(), '-DEBUG']
+        return ['java', get_src_name_without_ext(src_path), '-DEBUG']
     elif ext == '.cpp':
-        return [f'{get_src_name_without_ext()}.exe']
+        return [f'{get_src_name_without_ext(src_path)}.exe']
     elif ext == '.py':
-        return ['python', get_src_name()]
+        return ['python', get_src_name(src_path)]
     else:
         return []
 
@@ -458,6 +1760,13 @@ def equals(response, answer, maximum_error):
                 and abs((response - answer) / answer) <= maximum_error))
 
 
+def equals_token(ele_res, ele_ans, maximum_error):
+    if maximum_error != 0 and is_float(ele_res) and is_float(ele_ans):
+        return equals(float(ele_res), float(ele_ans), maximum_error)
+    else:
+        return ele_res == ele_ans
+
+
 def judge(response, answer, maximum_error):
     if answer == response:
         return True
@@ -468,92 +1777,816 @@ def judge(response, answer, maximum_error):
         if len(line_res) != len(line_ans):
             return False
         for ele_res, ele_ans in zip(line_res, line_ans):
-            if maximum_error != 0 and is_float(ele_res) and is_float(ele_ans):
-                if not equals(float(ele_res), float(ele_ans), maximum_error):
-                    return False
-            else:
-                if ele_res != ele_ans:
-                    return False
+            if not equals_token(ele_res, ele_ans, maximum_error):
+                return False
 
     return True
 
 
-def test(testcases, testcase_number):
-    if not build():
-        print("----- CE -----")
-        return False
+def iter_testcase_lines(testcase, kind):
+    if kind in testcase:
+        for line in testcase[kind].splitlines():
+            if line:
+                yield line
+        return
+    data = map_testcase(testcase, kind)
+    stream = io.BytesIO(data) if isinstance(data, bytes) else data
+    decoder = codecs.getincrementaldecoder('utf-8')('replace')
+    buffer = ''
+    try:
+        while True:
+            chunk = stream.read(PIPE_CHUNK_SIZE)
+            lines = (buffer + decoder.decode(chunk, not chunk)).split('\n')
+            buffer = lines.pop()
+            for line in lines:
+                line = line.rstrip('\r')
+                if line:
+                    yield line
+            if not chunk:
+                break
+        if buffer.rstrip('\r'):
+            yield buffer.rstrip('\r')
+    finally:
+        stream.close()
+
+
+class StreamJudge:
+    def __init__(self, answer_lines, maximum_error):
+        self.answer_lines = answer_lines
+        self.maximum_error = maximum_error
+        self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
+        self.buffer = ''
+        self.line_number = 0
+        self.context = deque(maxlen=JUDGE_CONTEXT_LINES)
+        self.mismatch = None
+
+    @traced('judge')
+    def feed(self, chunk):
+        if self.mismatch:
+            return
+        lines = (self.buffer + self.decoder.decode(chunk)).split('\n')
+        self.buffer = lines.pop()
+        for line in lines:
+            self.judge_line(line)
+            if self.mismatch:
+                self.buffer = ''
+                return
+
+    def judge_line(self, line):
+        line = line.rstrip('\r')
+        if not line:
+            return
+        self.line_number += 1
+        answer_line = next(self.answer_lines, None)
+        if answer_line == line:
+            self.context.append((self.line_number, line))
+            return
+        if answer_line is None:
+            self.set_mismatch(line, '', 0)
+            return
+        tokens_res = line.split()
+        tokens_ans = answer_line.split()
+        for i, (ele_res, ele_ans) in enumerate(zip(tokens_res, tokens_ans)):
+            if not equals_token(ele_res, ele_ans, self.maximum_error):
+                self.set_mismatch(line, answer_line, i)
+                return
+        if len(tokens_res) != len(tokens_ans):
+            self.set_mismatch(line, answer_line,
+                              min(len(tokens_res), len(tokens_ans)))
+            return
+        self.context.append((self.line_number, line))
+
+    def set_mismatch(self, line, answer_line, token_number):
+        self.mismatch = {
+            'line': self.line_number,
+            'token': token_number + 1,
+            'result': line,
+            'expected': answer_line,
+            'context': list(self.context)
+        }
+
+    @traced('judge')
+    def finish(self):
+        if not self.mismatch:
+            self.judge_line(self.buffer + self.decoder.decode(b'', True))
+        if not self.mismatch:
+            answer_line = next(self.answer_lines, None)
+            if answer_line is not None:
+                self.line_number += 1
+                self.set_mismatch('', answer_line, 0)
+        self.answer_lines.close()
+        return not self.mismatch
+
+
+def omit_line(line):
+    return (line if len(line) <= JUDGE_LINE_WIDTH
+            else line[:JUDGE_LINE_WIDTH] + " ...")
+
+
+def print_mismatch(mismatch):
+    print(f"First difference at line {mismatch['line']}, "
+          f"token {mismatch['token']} :")
+    for line_number, line in mismatch['context']:
+        print(f"   {line_number:>6} | {omit_line(line)}")
+    print(f"-> {mismatch['line']:>6} | result   : "
+          f"{omit_line(mismatch['result'])}")
+    print(f"   {'':>6} | expected : {omit_line(mismatch['expected'])}")
+
+
+def get_jobs(command, jobs=1):
+    args = []
+    i = 0
+    while i < len(command):
+        if command[i] == '-j':
+            if i + 1 < len(command) and command[i + 1].isdecimal():
+                jobs = max(int(command[i + 1]), 1)
+                i += 1
+            else:
+                jobs = os.cpu_count() or 1
+        else:
+            args.append(command[i])
+        i += 1
+    return args, jobs
 
-    is_all_ac = True
-    time_limit = testcases['info']['time limit']
 
-    if (not testcase_number
-       or f'testcase {testcase_number}' not in testcases.keys()):
-        testcase_number = None
+def resolve_command(command, cwd):
+    if command and os.path.isfile(os.path.join(cwd, command[0])):
+        return [os.path.join('.', command[0]), *command[1:]]
+    return command
 
-    for key, testcase in testcases.items():
-        if key == 'info':
-            continue
-        if testcase_number and key != f'testcase {testcase_number}':
-            is_all_ac = False
-            continue
 
-        status = ''
-        print("-------------------------------")
-        print(f'{key} : ', end='')
+def limit_resources(cpu_limit, memory_limit):
+    if not cpu_limit and not memory_limit:
+        return None
 
-        testcase_input = testcase['input']
-        testcase_output = testcase['output']
+    def set_limits():
+        if cpu_limit:
+            resource.setrlimit(resource.RLIMIT_CPU,
+                               (cpu_limit, cpu_limit + 1))
+        if memory_limit:
+            resource.setrlimit(resource.RLIMIT_AS,
+                               (memory_limit, memory_limit))
+    return set_limits
 
-        temp_path = "temp.txt"
-        with open(temp_path, 'w') as f:
-            f.write(testcase_input)
-        with open(temp_path, 'r') as f:
-            start_time = time.time()
-            try:
-                result = subprocess.run(get_run_command(),
-                                        cwd=get_src_dir(),
-                                        stdin=f,
-                                        stdout=subprocess.PIPE,
-                                        stderr=subprocess.PIPE,
-                                        timeout=time_limit * 2,
-                                        shell=True)
-            except subprocess.TimeoutExpired:
-                status = 'TLE'
-        os.remove(temp_path)
-
-        run_time = round((time.time() - start_time) * 1000)
-
-        if status == 'TLE':
-            cprint("TLE", 'yellow')
-            is_all_ac = False
-        else:
-            if run_time >= time_limit * 1000:
-                cprint("TLE", 'yellow', end='')
-                print(f" ({run_time} ms)")
-                is_all_ac = False
+
+class Cancellation:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.processes = set()
+        self.cancelled = False
+
+    def is_set(self):
+        return self.cancelled
+
+    def register(self, process):
+        with self.lock:
+            if self.cancelled:
+                process.kill()
             else:
-                output = result.stdout.decode()
-                answer = format_output(testcase_output)
-                response = format_output(output)
-
-                if judge(response, answer, testcases['info']['maximum error']):
-                    cprint("AC!", 'green', end='')
-                    print(f" ({run_time} ms)")
-                else:
-                    cprint("WA", 'yellow', end='')
-                    print(f" ({run_time} ms)")
-                    print("----input-----")
-                    print(testcase_input)
-                    print("----result----")
-                    print(output)
-                    print("---expected---")
-                    print(testcase_output)
-                    is_all_ac = False
+                self.processes.add(process)
+
+    def unregister(self, process):
+        with self.lock:
+            self.processes.discard(process)
+
+    def cancel(self):
+        with self.lock:
+            self.cancelled = True
+            for process in self.processes:
+                process.kill()
+            self.processes.clear()
+
+
+def execute_without_rusage(command, cwd, stdin, input, timeout, cancel=None):
+    timed_out = False
+    start_time = time.monotonic()
+    process = subprocess.Popen(command,
+                               cwd=cwd or None,
+                               stdin=(subprocess.PIPE if input is not None
+                                      else stdin),
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE,
+                               shell=True)
+    if cancel:
+        cancel.register(process)
+    try:
+        stdout, stderr = process.communicate(input, timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        stdout, stderr = process.communicate()
+        timed_out = True
+    if cancel:
+        cancel.unregister(process)
+    return {
+        'returncode': process.returncode,
+        'stdout': stdout,
+        'stderr': stderr,
+        'timeout': timed_out,
+        'wall time': round((time.monotonic() - start_time) * 1000),
+        'cpu time': None,
+        'memory': None
+    }
 
-            error_message = result.stderr.decode('cp932')
-            if error_message:
-                print("ERROR : ")
-                print(omit_error_message(error_message))
+
+def read_peak_memory(pid):
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def enlarge_pipe(pipe):
+    if hasattr(fcntl, 'F_SETPIPE_SZ'):
+        try:
+            fcntl.fcntl(pipe, fcntl.F_SETPIPE_SZ, PIPE_CHUNK_SIZE)
+        except OSError:
+            pass
+
+
+class OutputSpool:
+    # A FIFO of output chunks between the pipe reader and a slower
+    # consumer. Up to CONSUMER_BUFFER_SIZE bytes are kept in memory and the
+    # rest goes to a temporary file, so memory stays bounded without
+    # stalling the child on a full pipe.
+    def __init__(self):
+        self.chunks = deque()
+        self.size = 0
+        self.file = None
+        self.read_position = 0
+        self.write_position = 0
+        self.closed = False
+        self.condition = threading.Condition()
+
+    def put(self, chunk):
+        with self.condition:
+            if (self.file is None
+               and self.size + len(chunk) <= CONSUMER_BUFFER_SIZE):
+                self.chunks.append(chunk)
+                self.size += len(chunk)
+            else:
+                if self.file is None:
+                    self.file = tempfile.TemporaryFile()
+                self.file.seek(self.write_position)
+                self.file.write(chunk)
+                self.write_position += len(chunk)
+            self.condition.notify()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+    def get(self):
+        with self.condition:
+            while True:
+                if self.chunks:
+                    chunk = self.chunks.popleft()
+                    self.size -= len(chunk)
+                    return chunk
+                if self.file is not None:
+                    self.file.seek(self.read_position)
+                    chunk = self.file.read(min(
+                        PIPE_CHUNK_SIZE,
+                        self.write_position - self.read_position))
+                    self.read_position += len(chunk)
+                    if self.read_position == self.write_position:
+                        self.file.close()
+                        self.file = None
+                        self.read_position = self.write_position = 0
+                    return chunk
+                if self.closed:
+                    return b''
+                self.condition.wait()
+
+
+def read_pipe(pipe, outputs, name, consumer):
+    chunks = []
+    size = 0
+    if consumer:
+        spool = OutputSpool()
+        consumer_thread = threading.Thread(
+            target=lambda: [consumer(chunk) for chunk in iter(spool.get, b'')])
+        consumer_thread.start()
+    while True:
+        chunk = os.read(pipe.fileno(), PIPE_CHUNK_SIZE)
+        if not chunk:
+            break
+        if consumer:
+            spool.put(chunk)
+        elif size < OUTPUT_LIMIT:
+            chunks.append(chunk)
+            size += len(chunk)
+    if consumer:
+        spool.close()
+        consumer_thread.join()
+    outputs[name] = b''.join(chunks)
+    pipe.close()
+
+
+def write_pipe(pipe, input):
+    try:
+        pipe.write(input)
+        pipe.close()
+    except BrokenPipeError:
+        pass
+
+
+def start_io_threads(stdin, stdout, stderr, input, consumer, outputs):
+    threads = [threading.Thread(target=read_pipe,
+                                args=(stdout, outputs, 'stdout', consumer)),
+               threading.Thread(target=read_pipe,
+                                args=(stderr, outputs, 'stderr', None))]
+    if input is not None:
+        threads.append(threading.Thread(target=write_pipe,
+                                        args=(stdin, input)))
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+@traced('run')
+def execute(command, cwd, stdin=None, input=None, timeout=None,
+            cpu_limit=None, memory_limit=None, consumer=None, cancel=None):
+    if resource is None or not hasattr(os, 'wait4'):
+        result = execute_without_rusage(command, cwd, stdin, input, timeout,
+                                        cancel)
+        if consumer:
+            consumer(result['stdout'])
+            result['stdout'] = b''
+        return result
+
+    outputs = dict()
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    start_time = time.monotonic()
+    process = subprocess.Popen(resolve_command(command, cwd),
+                               cwd=cwd or None,
+                               stdin=(subprocess.PIPE if input is not None
+                                      else stdin),
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE,
+                               preexec_fn=limit_resources(cpu_limit,
+                                                          memory_limit))
+    if cancel:
+        cancel.register(process)
+    enlarge_pipe(process.stdout)
+    threads = start_io_threads(process.stdin, process.stdout, process.stderr,
+                               input, consumer, outputs)
+    timer = threading.Timer(timeout, kill) if timeout else None
+    if timer:
+        timer.start()
+
+    # Only samples taken after the child has run for a poll interval count;
+    # right after exec, VmHWM has not caught up with the program yet.
+    polled_memory = []
+    if read_peak_memory(process.pid):
+        exited = threading.Event()
+
+        def poll_memory():
+            while not exited.wait(MEMORY_POLL_INTERVAL):
+                polled_memory.append(read_peak_memory(process.pid))
+        poller = threading.Thread(target=poll_memory)
+        poller.start()
+        os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+        wall_time = time.monotonic() - start_time
+        exited.set()
+        poller.join()
+        _, status, rusage = os.wait4(process.pid, 0)
+    else:
+        _, status, rusage = os.wait4(process.pid, 0)
+        wall_time = time.monotonic() - start_time
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if timer:
+        timer.cancel()
+    if cancel:
+        cancel.unregister(process)
+    for thread in threads:
+        thread.join()
+
+    # The child's ru_maxrss includes what it inherited from this process at
+    # fork, which is bounded by our own peak read after the child is reaped.
+    # Below that, only the /proc samples are trustworthy, and without them
+    # the memory usage is unknown.
+    memory = rusage.ru_maxrss
+    baseline_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        memory //= 1024
+        baseline_memory //= 1024
+    if memory <= baseline_memory:
+        memory = max(polled_memory, default=0) or None
+    return {
+        'returncode': process.returncode,
+        'stdout': outputs['stdout'],
+        'stderr': outputs['stderr'],
+        'timeout': timed_out.is_set(),
+        'wall time': round(wall_time * 1000),
+        'cpu time': round((rusage.ru_utime + rusage.ru_stime) * 1000),
+        'memory': memory
+    }
+
+
+class WarmRunner:
+    def __init__(self):
+        self.sock, server_sock = socket.socketpair()
+        self.process = subprocess.Popen(
+            ['python', '-c', FORK_SERVER_CODE, str(server_sock.fileno()),
+             ','.join(WARM_MODULES)],
+            stdin=subprocess.DEVNULL,
+            pass_fds=[server_sock.fileno()])
+        server_sock.close()
+        self.reader = self.sock.makefile('rb')
+        self.reader.readline()
+
+    def run(self, request, fds):
+        socket.send_fds(self.sock, [json.dumps(request).encode()], fds)
+        return json.loads(self.reader.readline())
+
+    def wait(self):
+        return json.loads(self.reader.readline())
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+        self.process.wait()
+
+
+class WarmProcess:
+    def __init__(self, pid):
+        self.pid = pid
+
+    def kill(self):
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+warm_runners = Queue()
+
+
+def can_run_warm(src_path=None):
+    return (get_src_ext(src_path) == '.py' and hasattr(os, 'fork')
+            and hasattr(socket, 'send_fds'))
+
+
+def close_warm_runners():
+    while not warm_runners.empty():
+        warm_runners.get().close()
+
+
+atexit.register(close_warm_runners)
+
+
+@traced('run')
+def execute_warm(src_path, stdin=None, input=None, timeout=None,
+                 cpu_limit=None, memory_limit=None, consumer=None,
+                 cancel=None):
+    try:
+        runner = warm_runners.get_nowait()
+    except Empty:
+        runner = WarmRunner()
+
+    outputs = dict()
+    timed_out = threading.Event()
+    stdin_r, stdin_w = os.pipe() if input is not None else (None, None)
+    stdout_r, stdout_w = os.pipe()
+    stderr_r, stderr_w = os.pipe()
+    stdin_fd = stdin_r if input is not None else stdin.fileno()
+    request = {
+        'script': get_src_name(src_path),
+        'cwd': get_src_dir(src_path),
+        'cpu limit': cpu_limit,
+        'memory limit': memory_limit
+    }
+    pid = runner.run(request, [stdin_fd, stdout_w, stderr_w])['pid']
+    process = WarmProcess(pid)
+    if cancel:
+        cancel.register(process)
+    for fd in (stdin_r, stdout_w, stderr_w):
+        if fd is not None:
+            os.close(fd)
+
+    stdout = os.fdopen(stdout_r, 'rb')
+    enlarge_pipe(stdout)
+    threads = start_io_threads(
+        os.fdopen(stdin_w, 'wb') if input is not None else None,
+        stdout, os.fdopen(stderr_r, 'rb'), input, consumer, outputs)
+
+    def kill():
+        timed_out.set()
+        os.kill(pid, signal.SIGKILL)
+    timer = threading.Timer(timeout, kill) if timeout else None
+    if timer:
+        timer.start()
+    reply = runner.wait()
+    if timer:
+        timer.cancel()
+    if cancel:
+        cancel.unregister(process)
+    for thread in threads:
+        thread.join()
+    warm_runners.put(runner)
+
+    memory = reply['memory']
+    return {
+        'returncode': reply['returncode'],
+        'stdout': outputs['stdout'],
+        'stderr': outputs['stderr'],
+        'timeout': timed_out.is_set(),
+        'wall time': round(reply['wall time'] * 1000),
+        'startup time': round(reply['startup time'] * 1000),
+        'cpu time': round(reply['cpu time'] * 1000),
+        'memory': memory
+    }
+
+
+def cprint(text, color=None, on_color=None, **kwargs):
+    from termcolor import cprint as termcolor_cprint
+    termcolor_cprint(text, color, on_color, **kwargs)
+
+
+def get_verdict(result, time_limit, memory_limit=None):
+    time_limit_ms = time_limit * 1000
+    killed_signals = [-getattr(signal, name) for name in ('SIGKILL', 'SIGXCPU')
+                      if hasattr(signal, name)]
+    if (result['timeout']
+       or result['returncode'] in killed_signals
+       or result['wall time'] >= time_limit_ms
+       or (result['cpu time'] is not None
+           and result['cpu time'] >= time_limit_ms)):
+        return 'TLE'
+    if (memory_limit and result['memory'] is not None
+       and result['memory'] >= memory_limit * 1024):
+        return 'MLE'
+    if result['returncode'] != 0:
+        error_message = result['stderr'].decode('cp932', 'replace')
+        if memory_limit and re.search(r'MemoryError|bad_alloc|OutOfMemory',
+                                      error_message):
+            return 'MLE'
+        return 'RE'
+    return ''
+
+
+def format_usage(result):
+    usage = [f"{result['wall time']} ms"]
+    if result['cpu time'] is not None:
+        usage.append(f"cpu {result['cpu time']} ms")
+    if result['memory'] is not None:
+        usage.append(f"{result['memory']} KB")
+    if 'startup time' in result:
+        usage.append(f"startup {result['startup time']} ms")
+    return f" ({' / '.join(usage)})"
+
+
+@traced('testcase')
+def run_testcase(testcase, info, enforce_limits=False, warm=False,
+                 cancel=None, src_path=None):
+    time_limit = info['time limit']
+    memory_limit = info.get('memory limit')
+    cpu_limit = None
+    address_limit = None
+    if enforce_limits:
+        cpu_limit = math.ceil(time_limit * 2)
+        if memory_limit:
+            address_limit = int(memory_limit * 1024 * 1024)
+
+    stream_judge = StreamJudge(iter_testcase_lines(testcase, 'output'),
+                               info['maximum error'])
+    if warm:
+        def run_command(**kwargs):
+            return execute_warm(src_path, cancel=cancel, **kwargs)
+    else:
+        def run_command(**kwargs):
+            return execute(get_run_command(src_path), get_src_dir(src_path),
+                           cancel=cancel, **kwargs)
+    if 'input path' in testcase:
+        with open(testcase['input path'], 'rb') as stdin:
+            result = run_command(stdin=stdin, timeout=time_limit * 2,
+                                 cpu_limit=cpu_limit,
+                                 memory_limit=address_limit,
+                                 consumer=stream_judge.feed)
+    else:
+        result = run_command(input=testcase['input'].encode(),
+                             timeout=time_limit * 2,
+                             cpu_limit=cpu_limit,
+                             memory_limit=address_limit,
+                             consumer=stream_judge.feed)
+    result['verdict'] = get_verdict(result, time_limit, memory_limit)
+    if not stream_judge.finish() and not result['verdict']:
+        result['verdict'] = 'WA'
+    result['mismatch'] = stream_judge.mismatch
+    return result
+
+
+def print_result(key, testcase, result):
+    is_ac = False
+    print("-------------------------------")
+    print(f'{key} : ', end='')
+
+    if result['verdict'] == 'WA':
+        cprint("WA", 'yellow', end='')
+        print(format_usage(result))
+        print("----input-----")
+        print(preview_testcase(testcase, 'input'))
+        print("---mismatch---")
+        print_mismatch(result['mismatch'])
+    elif result['verdict']:
+        cprint(result['verdict'], 'yellow', end='')
+        print(format_usage(result))
+    else:
+        cprint("AC!", 'green', end='')
+        print(format_usage(result))
+        is_ac = True
+
+    if not result['timeout']:
+        error_message = result['stderr'].decode('cp932')
+        if error_message:
+            print("ERROR : ")
+            print(omit_error_message(error_message))
+    return is_ac
+
+
+def select_testcases(testcases, testcase_number):
+    if (not testcase_number
+       or f'testcase {testcase_number}' not in testcases.keys()):
+        testcase_number = None
+    return [(key, testcase) for key, testcase in testcases.items()
+            if key != 'info' and (not testcase_number
+                                  or key == f'testcase {testcase_number}')]
+
+
+def run_testcases(testcases, targets, jobs=1, enforce_limits=False,
+                  warm=False, cancel=None, src_path=None):
+    info = testcases['info']
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [executor.submit(run_testcase, testcase, info,
+                                   enforce_limits, warm, cancel, src_path)
+                   for _, testcase in targets]
+        for (key, testcase), future in zip(targets, futures):
+            yield key, testcase, future.result()
+
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    contest TEXT NOT NULL,
+    task TEXT NOT NULL,
+    testcase TEXT NOT NULL,
+    src_hash TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    wall_time INTEGER,
+    cpu_time INTEGER,
+    memory INTEGER,
+    runner TEXT,
+    jobs INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (contest, task, time);
+CREATE INDEX IF NOT EXISTS runs_by_version
+    ON runs (contest, task, src_hash, testcase);
+"""
+# Columns added after the first schema, with their types.
+HISTORY_ADDED_COLUMNS = [('runner', 'TEXT'), ('jobs', 'INTEGER')]
+
+
+def connect_history():
+    import sqlite3
+    os.makedirs(SAVE_DIR, exist_ok=True)
+    connection = sqlite3.connect(HISTORY_DB_PATH, timeout=10)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    connection.executescript(HISTORY_SCHEMA)
+    columns = {row[1] for row
+               in connection.execute('PRAGMA table_info(runs)')}
+    for name, column_type in HISTORY_ADDED_COLUMNS:
+        if name not in columns:
+            connection.execute(
+                f'ALTER TABLE runs ADD COLUMN {name} {column_type}')
+    return connection
+
+
+def fetch_previous_times(connection, contest_name, task_name, src_hash,
+                         runner, jobs):
+    # Warm and cold runs, or runs at different -j levels, are different
+    # measurements, so only runs made the same way are compared.
+    rows = connection.execute(
+        """SELECT testcase, MIN(wall_time) FROM runs
+           WHERE contest = ? AND task = ? AND verdict = ''
+               AND runner = ? AND jobs = ? AND src_hash = (
+               SELECT src_hash FROM runs
+               WHERE contest = ? AND task = ? AND runner = ? AND jobs = ?
+                   AND src_hash != ?
+               ORDER BY time DESC LIMIT 1)
+           GROUP BY testcase""",
+        (contest_name, task_name, runner, jobs,
+         contest_name, task_name, runner, jobs, src_hash))
+    return dict(rows)
+
+
+def record_history(contest_name, task_number, results, src_path=None,
+                   warm=False, jobs=1):
+    import sqlite3
+    task_name = convert_to_task_name(task_number)
+    src_hash = get_src_hash(src_path)
+    runner = 'warm' if warm else 'cold'
+    now = time.time()
+    rows = [(now, contest_name, task_name, key, src_hash, result['verdict'],
+             result['wall time'], result['cpu time'], result['memory'],
+             runner, jobs)
+            for key, result in results]
+    regressions = []
+    try:
+        connection = connect_history()
+        try:
+            with connection:
+                previous_times = fetch_previous_times(connection,
+                                                      contest_name,
+                                                      task_name, src_hash,
+                                                      runner, jobs)
+                connection.executemany(
+                    """INSERT INTO runs (time, contest, task, testcase,
+                                         src_hash, verdict, wall_time,
+                                         cpu_time, memory, runner, jobs)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""", rows)
+        finally:
+            connection.close()
+    except sqlite3.Error as e:
+        print(f"Failed in recording the history : {e}")
+        return regressions
+
+    for key, result in results:
+        previous_time = previous_times.get(key)
+        wall_time = result['wall time']
+        if (previous_time and not result['verdict']
+           and wall_time - previous_time >= HISTORY_REGRESSION_MIN_TIME
+           and wall_time > previous_time * (1 + HISTORY_REGRESSION_RATE)):
+            regressions.append((key, previous_time, wall_time))
+    return regressions
+
+
+def print_regressions(regressions):
+    for key, previous_time, wall_time in regressions:
+        rate = (wall_time / previous_time - 1) * 100
+        cprint(f"Warning : {key} got {rate:.0f}% slower than the previous "
+               f"version ({previous_time} ms -> {wall_time} ms)", 'yellow')
+
+
+def print_history(contest_name, task_number):
+    import sqlite3
+    task_name = convert_to_task_name(task_number)
+    try:
+        connection = connect_history()
+        try:
+            rows = connection.execute(
+                """SELECT src_hash, MAX(time), COUNT(*),
+                          SUM(verdict = ''), MAX(wall_time), MAX(memory)
+                   FROM runs WHERE contest = ? AND task = ?
+                   GROUP BY src_hash ORDER BY MAX(time) DESC LIMIT ?""",
+                (contest_name, task_name, HISTORY_VERSIONS)).fetchall()
+        finally:
+            connection.close()
+    except sqlite3.Error as e:
+        print(f"Failed in reading the history : {e}")
+        return
+    if not rows:
+        print(f"No history for {contest_name}_{task_name}.")
+        return
+    print(f"History for {contest_name}_{task_name} (newest first) :")
+    for src_hash, last_time, runs, passed, wall_time, memory in rows:
+        print(f"  {datetime.fromtimestamp(last_time):%Y-%m-%d %H:%M:%S} "
+              f"{src_hash[:8]} : {passed}/{runs} AC, max {wall_time} ms, "
+              f"max {memory} KB")
+
+
+def test(testcases, testcase_number, jobs=1, enforce_limits=False,
+         warm=False, contest_name=None, task_number=None):
+    if not build():
+        print("----- CE -----")
+        return False
+    if warm and not can_run_warm():
+        print("The warm runner is only available for Python on POSIX.")
+        warm = False
+
+    targets = select_testcases(testcases, testcase_number)
+    is_all_ac = len(targets) == len(testcases) - 1
+
+    results = []
+    for key, testcase, result in run_testcases(testcases, targets, jobs,
+                                               enforce_limits, warm):
+        if not print_result(key, testcase, result):
+            is_all_ac = False
+        results.append((key, result))
+    if contest_name:
+        print_regressions(record_history(contest_name, task_number, results,
+                                         warm=warm, jobs=jobs))
 
     if not is_all_ac:
         cprint(" ----- WA ----- ", 'white', 'on_yellow')
@@ -561,10 +2594,104 @@ def test(testcases, testcase_number):
     return is_all_ac
 
 
-def test_all(contest_name, task_number, testcase_number):
+def natural_key(name):
+    return [int(part) if part.isdecimal() else part
+            for part in re.split(r'([0-9]+)', name)]
+
+
+def find_subdir(directory, names):
+    for name in names:
+        path = os.path.join(directory, name)
+        if os.path.isdir(path):
+            return path
+    return None
+
+
+def iter_dir_testcases(directory):
+    input_dir = find_subdir(directory, INPUT_DIR_NAMES)
+    output_dir = find_subdir(directory, OUTPUT_DIR_NAMES)
+    if input_dir and output_dir:
+        names = sorted((entry.name for entry in os.scandir(input_dir)
+                        if entry.is_file()), key=natural_key)
+        for name in names:
+            output_path = os.path.join(output_dir, name)
+            if os.path.isfile(output_path):
+                yield name, {'input path': os.path.join(input_dir, name),
+                             'output path': output_path}
+        return
+
+    names = sorted((entry.name for entry in os.scandir(directory)
+                    if entry.is_file() and entry.name.endswith('.in')),
+                   key=natural_key)
+    for name in names:
+        stem = name[:-len('.in')]
+        for ext in OUTPUT_EXTS:
+            output_path = os.path.join(directory, stem + ext)
+            if os.path.isfile(output_path):
+                yield stem, {'input path': os.path.join(directory, name),
+                             'output path': output_path}
+                break
+
+
+def test_dir(directory, info, jobs=1, enforce_limits=False, warm=False,
+             contest_name=None, task_number=None):
+    if not os.path.isdir(directory):
+        print(f"{directory} is not a directory ...")
+        return False
+    if not build():
+        print("----- CE -----")
+        return False
+    if warm and not can_run_warm():
+        print("The warm runner is only available for Python on POSIX.")
+        warm = False
+
+    results = []
+    slowest = None
+
+    def report(key, testcase, future):
+        nonlocal slowest
+        result = future.result()
+        results.append((key, result))
+        print_result(key, testcase, result)
+        if slowest is None or result['wall time'] > slowest[1]:
+            slowest = (key, result['wall time'])
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for key, testcase in iter_dir_testcases(directory):
+            pending.append((key, testcase,
+                            executor.submit(run_testcase, testcase, info,
+                                            enforce_limits, warm)))
+            if len(pending) >= jobs * 2:
+                report(*pending.popleft())
+        while pending:
+            report(*pending.popleft())
+
+    if not results:
+        print(f"No pairs of input and expected output in {directory} ...")
+        return False
+    if contest_name and task_number is not None and task_number >= 0:
+        print_regressions(record_history(contest_name, task_number, results,
+                                         warm=warm, jobs=jobs))
+
+    passed = sum(not result['verdict'] for _, result in results)
+    print("-------------------------------")
+    print(f"{passed}/{len(results)} AC, slowest : {slowest[0]} "
+          f"({slowest[1]} ms)")
+    if passed == len(results):
+        cprint(" ! ! ! All cases passed ! ! ! ", 'white', 'on_green')
+    else:
+        cprint(" ----- WA ----- ", 'white', 'on_yellow')
+    print()
+    return passed == len(results)
+
+
+def test_all(contest_name, task_number, testcase_number, jobs=1,
+             enforce_limits=False, warm=False):
     print(("Testing your source code for "
           f"{contest_name}_{convert_to_task_name(task_number)} ..."))
-    if test(load_testcases(contest_name, task_number), testcase_number):
+    if test(load_testcases(contest_name, task_number), testcase_number,
+            jobs, enforce_limits, warm, contest_name, task_number):
         cprint(" ! ! ! AC ! ! ! ", 'white', 'on_green')
         print()
         print("Would you submit your source code? y/n")
@@ -572,6 +2699,565 @@ def test_all(contest_name, task_number, testcase_number):
             submit(contest_name, task_number)
 
 
+class InotifyWatcher:
+    def __init__(self, path):
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.name = os.fsencode(os.path.basename(path))
+        self.fd = libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        directory = os.fsencode(os.path.dirname(os.path.abspath(path)))
+        if libc.inotify_add_watch(self.fd, directory, mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+
+    def wait(self, timeout=None):
+        import select
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return False
+        data = os.read(self.fd, 64 * 1024)
+        changed = False
+        offset = 0
+        while offset + 16 <= len(data):
+            length = int.from_bytes(data[offset + 12:offset + 16],
+                                    sys.byteorder)
+            name = data[offset + 16:offset + 16 + length].rstrip(b'\0')
+            changed = changed or name == self.name
+            offset += 16 + length
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollWatcher:
+    def __init__(self, path):
+        self.path = path
+        self.stat = self.get_stat()
+
+    def get_stat(self):
+        try:
+            stat = os.stat(self.path)
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    def wait(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stat = self.get_stat()
+            if stat != self.stat:
+                self.stat = stat
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(WATCH_POLL_INTERVAL)
+
+    def close(self):
+        pass
+
+
+def make_file_watcher(path):
+    if sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError):
+            pass
+    return PollWatcher(path)
+
+
+def print_watch_status(results, build_time):
+    print(f"[{datetime.now():%H:%M:%S}] ", end='')
+    for key, result in results:
+        verdict = result['verdict'] or 'AC'
+        print(f"{key.split()[-1]}:", end='')
+        cprint(verdict, 'green' if verdict == 'AC' else 'yellow', end=' ')
+    run_time = max([result['wall time'] for _, result in results] or [0])
+    print(f"(build {build_time:.2f}s, max {run_time} ms)")
+
+    for key, result in results:
+        if result['verdict'] == 'WA':
+            print(f"{key} :")
+            print_mismatch(result['mismatch'])
+            break
+        elif result['verdict'] == 'RE':
+            print(f"{key} :")
+            print(omit_error_message(result['stderr'].decode('cp932')))
+            break
+
+
+def run_watch_cycle(testcases, testcase_number, jobs, enforce_limits, warm,
+                    cancel):
+    start_time = time.monotonic()
+    if not build(cancel=cancel):
+        if not cancel.is_set():
+            print(f"[{datetime.now():%H:%M:%S}] ", end='')
+            cprint("CE", 'yellow')
+        return
+    build_time = time.monotonic() - start_time
+
+    targets = select_testcases(testcases, testcase_number)
+    results = [(key, result) for key, _, result
+               in run_testcases(testcases, targets, jobs, enforce_limits,
+                                warm, cancel)]
+    if not cancel.is_set():
+        print_watch_status(results, build_time)
+
+
+def watch(contest_name, task_number, testcase_number, jobs=1,
+          enforce_limits=False, warm=False):
+    src_path = load_src_path()
+    testcases = load_testcases(contest_name, task_number)
+    if warm and not can_run_warm():
+        print("The warm runner is only available for Python on POSIX.")
+        warm = False
+    watcher = make_file_watcher(src_path)
+    print(f"Watching {src_path} for "
+          f"{contest_name}_{convert_to_task_name(task_number)} ... "
+          "(Ctrl+C to stop)")
+
+    cycle = None
+
+    def restart_cycle():
+        nonlocal cycle
+        if cycle:
+            thread, cancel = cycle
+            cancel.cancel()
+            thread.join()
+        cancel = Cancellation()
+        thread = threading.Thread(target=run_watch_cycle,
+                                  args=(testcases, testcase_number, jobs,
+                                        enforce_limits, warm, cancel))
+        cycle = (thread, cancel)
+        thread.start()
+
+    try:
+        restart_cycle()
+        while True:
+            if not watcher.wait():
+                continue
+            while watcher.wait(WATCH_DEBOUNCE):
+                pass
+            restart_cycle()
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        thread, cancel = cycle
+        cancel.cancel()
+        thread.join()
+        watcher.close()
+
+
+def run_profiled(command, cwd, testcase, timeout):
+    with open(testcase['input path'], 'rb') as stdin:
+        result = execute(command, cwd, stdin=stdin, timeout=timeout)
+    print(f"Profiled run{format_usage(result)}"
+          f"{' : timed out' if result['timeout'] else ''}")
+    return result
+
+
+def print_report(command, predicate=None):
+    result = subprocess.run(command, stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE)
+    lines = result.stdout.decode('utf-8', 'replace').splitlines()
+    lines = [line for line in lines if line.strip()
+             and (predicate is None or predicate(line))]
+    if lines:
+        print('\n'.join(lines[:PROFILE_REPORT_LINES]))
+    else:
+        print(f"{command[0]} reported nothing "
+              f"(exit code {result.returncode}).")
+    if result.returncode != 0 or not lines:
+        error = result.stderr.decode('utf-8', 'replace').strip()
+        if error:
+            print('\n'.join(error.splitlines()[:PROFILE_REPORT_LINES]))
+    return result.returncode == 0 and bool(lines)
+
+
+def print_hot_lines(src_path, counts_path):
+    counts = []
+    with open(counts_path) as f:
+        for line in f:
+            lineno, seconds = line.split()
+            counts.append((int(lineno), float(seconds)))
+    total = sum(seconds for _, seconds in counts)
+    print(f"----- hot lines ({round(total * 1000)} ms of cpu time) -----")
+    if not counts:
+        print("The run was too short to take any sample.")
+        return
+    with open(src_path, encoding='utf-8', errors='replace') as f:
+        src_lines = f.read().splitlines()
+    counts.sort(key=lambda item: item[1], reverse=True)
+    for lineno, seconds in counts[:PROFILE_TOP]:
+        text = src_lines[lineno - 1].strip() if lineno <= len(src_lines) \
+            else ''
+        print(f"{seconds * 100 / total:>6.1f}% {round(seconds * 1000):>6} ms "
+              f"line {lineno:<5} {text}")
+
+
+def profile_python(testcase, base_path, timeout):
+    import pstats
+    profile_path = f"{base_path}.prof"
+    command = ['python', '-m', 'cProfile', '-o', profile_path,
+               get_src_name()]
+    run_profiled(command, get_src_dir(), testcase, timeout)
+    if not os.path.exists(profile_path):
+        print("Failed in profiling ...")
+        return None
+    print("----- hot functions -----")
+    stats = pstats.Stats(profile_path, stream=sys.stdout)
+    stats.strip_dirs().sort_stats('tottime').print_stats(PROFILE_TOP)
+
+    if not hasattr(signal, 'setitimer'):
+        print("Line sampling needs setitimer, which this platform lacks; "
+              "only functions are reported.")
+        return profile_path
+    # A second run without cProfile, whose per-call overhead would skew
+    # where the samples land.
+    print("Sampling lines ...")
+    counts_path = f"{base_path}.lines"
+    if os.path.exists(counts_path):
+        os.remove(counts_path)
+    run_profiled(['python', '-c', LINE_SAMPLER_CODE, get_src_name(),
+                  counts_path, str(PROFILE_SAMPLE_INTERVAL)],
+                 get_src_dir(), testcase, timeout)
+    if not os.path.exists(counts_path):
+        print("Failed in sampling lines ...")
+        return profile_path
+    print_hot_lines(os.path.join(get_src_dir(), get_src_name()), counts_path)
+    return profile_path
+
+
+def build_profiling_binary(extra_flags, exe_path):
+    print("Building with profiling options ...")
+    result = subprocess.run(['g++', get_src_name(), *load_cpp_flags(), '-g',
+                             '-fno-omit-frame-pointer', *extra_flags,
+                             '-o', exe_path],
+                            cwd=get_src_dir(), stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        print("Compilation error : ")
+        print(result.stderr.decode('cp932', 'replace'))
+    return result.returncode == 0
+
+
+def profile_cpp(testcase, base_path, timeout):
+    exe_path = f"{base_path}.exe"
+    if shutil.which('perf'):
+        data_path = f"{base_path}.perf.data"
+        if not build_profiling_binary([], exe_path):
+            return None
+        result = run_profiled(['perf', 'record', '-g', '-q', '-o', data_path,
+                               '--', exe_path],
+                              get_src_dir(), testcase, timeout)
+        if result['returncode'] == 0 and os.path.exists(data_path):
+            def is_entry(line):
+                return not line.startswith('#')
+            print("----- hot functions -----")
+            print_report(['perf', 'report', '--stdio', '--no-children',
+                          '-g', 'none', '--sort', 'symbol', '-i', data_path],
+                         is_entry)
+            print("----- hot lines -----")
+            print_report(['perf', 'report', '--stdio', '--no-children',
+                          '-g', 'none', '--sort', 'srcline', '-i',
+                          data_path], is_entry)
+            return data_path
+        print("perf is not usable here, falling back to gprof ...")
+
+    if not shutil.which('gprof'):
+        print("perf or gprof is required to profile C++ ...")
+        return None
+    if not build_profiling_binary(['-pg'], exe_path):
+        return None
+    gmon_path = os.path.join(PROFILE_DIR, 'gmon.out')
+    if os.path.exists(gmon_path):
+        os.remove(gmon_path)
+    run_profiled([exe_path], PROFILE_DIR, testcase, timeout)
+    if not os.path.exists(gmon_path):
+        print("Failed in profiling (gmon.out was not written) ...")
+        return None
+    profile_path = f"{base_path}.gmon.out"
+    os.replace(gmon_path, profile_path)
+    print("----- hot functions -----")
+    print_report(['gprof', '-b', '-p', exe_path, profile_path])
+    print("----- hot lines -----")
+    print_report(['gprof', '-b', '-l', '-p', exe_path, profile_path])
+    return profile_path
+
+
+def profile_java(testcase, base_path, timeout):
+    from collections import Counter
+    profile_path = f"{base_path}.jfr"
+    run_command = get_run_command()
+    command = ['java', f'-XX:StartFlightRecording=filename={profile_path},'
+               'settings=profile', *run_command[1:]]
+    run_profiled(command, get_src_dir(), testcase, timeout)
+    if not os.path.exists(profile_path):
+        print("Failed in profiling ...")
+        return None
+    if not shutil.which('jfr'):
+        print("jfr is required to print the hot spots ...")
+        return profile_path
+
+    result = subprocess.run(['jfr', 'print', '--events',
+                             'jdk.ExecutionSample', profile_path],
+                            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    frames = Counter()
+    lines = iter(result.stdout.decode('utf-8', 'replace').splitlines())
+    for line in lines:
+        if line.strip().startswith('stackTrace = ['):
+            top_frame = next(lines, '').strip()
+            if top_frame:
+                frames[top_frame] += 1
+    total = sum(frames.values())
+    print(f"----- hot frames ({total} samples) -----")
+    for frame, count in frames.most_common(PROFILE_TOP):
+        print(f"{count * 100 / total:>6.1f}% {count:>6} {frame}")
+    return profile_path
+
+
+def profile(contest_name, task_number, testcase_number):
+    testcases = load_testcases(contest_name, task_number)
+    key = f'testcase {testcase_number or 1}'
+    if key not in testcases:
+        print("The testcase cannot be found.")
+        return
+    timeout = testcases['info']['time limit'] * PROFILE_TIMEOUT_RATE
+    ext = get_src_ext()
+    if ext in ('.py', '.java') and not build():
+        print("----- CE -----")
+        return
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base_path = os.path.abspath(os.path.join(
+        PROFILE_DIR, f"{contest_name}_{convert_to_task_name(task_number)}_"
+        f"{key.split()[-1]}"))
+    print(f"Profiling {contest_name}_{convert_to_task_name(task_number)} "
+          f"on {key} ...")
+    if ext == '.py':
+        profile_path = profile_python(testcases[key], base_path, timeout)
+    elif ext == '.cpp':
+        profile_path = profile_cpp(testcases[key], base_path, timeout)
+    elif ext == '.java':
+        profile_path = profile_java(testcases[key], base_path, timeout)
+    else:
+        print(f"Profiling {ext} is not supported ...")
+        return
+    if profile_path:
+        print(f"Saved the raw profile in {profile_path}.")
+
+
+def get_option(command, name, value=None):
+    args = []
+    i = 0
+    while i < len(command):
+        if command[i] == name and i + 1 < len(command):
+            value = command[i + 1]
+            i += 1
+        else:
+            args.append(command[i])
+        i += 1
+    return args, value
+
+
+def get_rate(command):
+    args, rate = get_option(command, '-r', DOWNLOAD_RATE)
+    try:
+        rate = float(rate)
+    except ValueError:
+        rate = 0
+    if rate <= 0:
+        print("The rate must be a positive number of requests per second.")
+        return args, None
+    return args, rate
+
+
+def run_stress_case(generator_path, reference_path, seed, maximum_error):
+    generated = execute(get_run_command(generator_path) + [str(seed)],
+                        get_src_dir(generator_path), timeout=STRESS_TIMEOUT)
+    if generated['timeout'] or generated['returncode'] != 0:
+        return {'seed': seed, 'verdict': 'generator error',
+                'input': b'', 'result': generated, 'expected': None}
+
+    stress_input = generated['stdout']
+    result = execute(get_run_command(), get_src_dir(),
+                     input=stress_input, timeout=STRESS_TIMEOUT)
+    expected = execute(get_run_command(reference_path),
+                       get_src_dir(reference_path),
+                       input=stress_input, timeout=STRESS_TIMEOUT)
+    verdict = get_verdict(result, STRESS_TIMEOUT)
+    if not verdict and get_verdict(expected, STRESS_TIMEOUT):
+        verdict = 'reference error'
+    if not verdict:
+        response = format_output(result['stdout'].decode())
+        answer = format_output(expected['stdout'].decode())
+        if not judge(response, answer, maximum_error):
+            verdict = 'WA'
+    return {'seed': seed, 'verdict': verdict, 'input': stress_input,
+            'result': result, 'expected': expected}
+
+
+def save_stress_failure(failure):
+    os.makedirs(STRESS_DIR, exist_ok=True)
+    input_path = os.path.join(STRESS_DIR, "failed_input.txt")
+    with open(input_path, 'wb') as f:
+        f.write(failure['input'])
+    if failure['expected']:
+        with open(os.path.join(STRESS_DIR, "expected_output.txt"), 'wb') as f:
+            f.write(failure['expected']['stdout'])
+    return input_path
+
+
+def stress(generator_path, reference_path, count, seed, jobs,
+           maximum_error=0):
+    for src_path in (None, generator_path, reference_path):
+        if not build(src_path):
+            print("----- CE -----")
+            return False
+
+    print(f"Stress testing with seed {seed} ...")
+    failures = []
+    done = 0
+    start_time = time.monotonic()
+    last_report = 0
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        next_seed = seed
+        running = set()
+        while running or (not failures and next_seed < seed + count):
+            while (not failures and next_seed < seed + count
+                   and len(running) < jobs * 2):
+                running.add(executor.submit(run_stress_case, generator_path,
+                                            reference_path, next_seed,
+                                            maximum_error))
+                next_seed += 1
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                case = future.result()
+                done += 1
+                if case['verdict']:
+                    failures.append(case)
+            elapsed = time.monotonic() - start_time
+            if elapsed - last_report >= 0.5 or not running:
+                last_report = elapsed
+                print(f"\r{done}/{count} cases "
+                      f"({done / max(elapsed, 1e-9):.1f} cases/sec)", end='')
+    print()
+
+    if not failures:
+        cprint(" ! ! ! All cases passed ! ! ! ", 'white', 'on_green')
+        print()
+        return True
+
+    failure = min(failures, key=lambda case: (len(case['input']),
+                                              case['seed']))
+    cprint(f" ----- {failure['verdict']} ----- ", 'white', 'on_yellow')
+    print()
+    print(f"seed : {failure['seed']}")
+    print("----input-----")
+    print(omit_error_message(failure['input'].decode('cp932', 'replace')))
+    if failure['verdict'] == 'WA':
+        print("----result----")
+        print(omit_error_message(failure['result']['stdout'].decode()))
+        print("---expected---")
+        print(omit_error_message(failure['expected']['stdout'].decode()))
+    error_message = failure['result']['stderr'].decode('cp932', 'replace')
+    if error_message:
+        print("ERROR : ")
+        print(omit_error_message(error_message))
+    input_path = save_stress_failure(failure)
+    print(f"Saved the failing input in {input_path}.")
+    return False
+
+
+def fit_growth_model(sizes, times):
+    best = None
+    for name, growth in GROWTH_MODELS:
+        xs = [growth(n) for n in sizes]
+        ws = [1 / (t * t) for t in times]
+        sw = sum(ws)
+        sx = sum(w * x for w, x in zip(ws, xs))
+        st = sum(w * t for w, t in zip(ws, times))
+        sxx = sum(w * x * x for w, x in zip(ws, xs))
+        sxt = sum(w * x * t for w, x, t in zip(ws, xs, times))
+        determinant = sw * sxx - sx * sx
+        if determinant > 0:
+            a = (sxx * st - sx * sxt) / determinant
+            b = (sw * sxt - sx * st) / determinant
+        else:
+            a, b = -1, 0
+        if a < 0:
+            a, b = 0, sxt / sxx
+        if b < 0:
+            # Flat or decreasing times mean no measurable growth, so the
+            # model degenerates into a constant.
+            name, a, b = 'O(1)', st / sw, 0
+        error = sum(((a + b * x - t) / t) ** 2 for x, t in zip(xs, times))
+        if best is None or error < best[1]:
+            best = ((name, growth, a, b), error)
+    return best[0]
+
+
+def estimate_complexity(generator_path, max_size, time_limit):
+    for src_path in (None, generator_path):
+        if not build(src_path):
+            print("----- CE -----")
+            return False
+
+    print(f"Estimating time complexity up to N = {max_size} ...")
+    print(f"{'N':>12} | {'time (ms)':>10}")
+    sizes = []
+    times = []
+    size = max(max_size // pow(2, COMPLEXITY_STEPS), 1)
+    while size <= max_size:
+        run_times = []
+        for seed in range(COMPLEXITY_REPEAT):
+            generated = execute(
+                get_run_command(generator_path) + [str(size), str(seed)],
+                get_src_dir(generator_path), timeout=STRESS_TIMEOUT)
+            if generated['timeout'] or generated['returncode'] != 0:
+                print("The generator failed ...")
+                return False
+            result = execute(get_run_command(), get_src_dir(),
+                             input=generated['stdout'],
+                             timeout=time_limit * COMPLEXITY_TIMEOUT_RATE)
+            verdict = get_verdict(result, time_limit * COMPLEXITY_TIMEOUT_RATE)
+            if verdict:
+                break
+            run_time = result['cpu time']
+            if run_time is None:
+                run_time = result['wall time']
+            run_times.append(max(run_time, 1))
+        if verdict:
+            print(f"{size:>12} | {verdict:>10}")
+            if verdict != 'TLE':
+                cprint(f" ----- {verdict} ----- ", 'white', 'on_yellow')
+                print()
+                return False
+            break
+        sizes.append(size)
+        times.append(min(run_times))
+        print(f"{size:>12} | {times[-1]:>10}")
+        if size == max_size or times[-1] >= time_limit * 1000:
+            break
+        size = min(size * 2, max_size)
+
+    if len(sizes) < 3:
+        print("Not enough measurements to fit a growth model.")
+        return False
+    name, growth, a, b = fit_growth_model(sizes, times)
+    predicted_time = (a + b * growth(max_size)) / 1000
+    message = (f"{name} : predicted {predicted_time:.2f} s "
+               f"vs {time_limit:g} s limit")
+    if predicted_time < time_limit:
+        cprint(f" {message} ", 'white', 'on_green')
+    else:
+        cprint(f" {message} ", 'white', 'on_yellow')
+    print()
+    return predicted_time < time_limit
+
+
 def load_src_code():
     try:
         with open(load_src_path(), 'r') as f:
@@ -580,55 +3266,372 @@ def load_src_code():
         return ''
 
 
-def get_language_id():
+def get_language_id(languages=None):
     ext = get_src_ext()
     if ext == '.java':
-        return '4005'
+        language_id = '4005'
     elif ext == '.cpp':
-        return '4003'
+        language_id = '4003'
     elif ext == '.py':
-        return '4006'
+        language_id = '4006'
     else:
         return ''
+    if languages and language_id not in languages:
+        for candidate_id, name in languages.items():
+            if LANGUAGE_NAME_RES[ext].search(name):
+                return candidate_id
+    return language_id
 
 
 def fetch_task_name(submit_url, task_number):
+    from bs4 import BeautifulSoup
     ses = load_ses()
-    r = ses.get(submit_url)
+    r = cached_get(ses, submit_url)
     soup = BeautifulSoup(r.text, 'lxml')
     select_task_list = soup.find('select', id='select-task').find_all('option')
     task_names = [select_task.get('value') for select_task in select_task_list]
     return task_names[task_number]
 
 
+@traced('submit')
 def submit(contest_name, task_number):
     submit_url = urljoin(BASE_URL, f"contests/{contest_name}/submit")
 
     ses = load_ses()
-    csrf_token = load_csrf_token()
 
     src_code = load_src_code()
-    language_id = get_language_id()
-    task_screen_name = fetch_task_name(submit_url, task_number)
+    metadata = load_contest_metadata(contest_name)
+    language_id = get_language_id(metadata.get('languages'))
+    task_screen_names = metadata.get('task screen names', [])
+    if task_number < len(task_screen_names):
+        task_screen_name = task_screen_names[task_number]
+    else:
+        task_screen_name = fetch_task_name(submit_url, task_number)
 
     data = {
-        'csrf_token': csrf_token,
+        'csrf_token': load_csrf_token(),
         'data.LanguageId': language_id,
         'data.TaskScreenName': task_screen_name,
         'sourceCode': src_code
     }
 
     result = ses.post(submit_url, data)
+    if result.status_code == 403 or is_login_redirect(result):
+        ses = renew_session(ses)
+        data['csrf_token'] = load_csrf_token()
+        result = ses.post(submit_url, data)
 
     if result.status_code == 200 and result.url != submit_url:
         print("Submit successful!")
+        match = SUBMISSION_ID_RE.search(result.text)
+        if match:
+            track_submission(contest_name, match.group(1), task_screen_name)
     else:
         print("Submit failed ...")
 
 
+def parse_submission_status(html):
+    label = SUBMISSION_LABEL_RE.search(html)
+    exec_time = SUBMISSION_TIME_RE.search(html)
+    memory = SUBMISSION_MEMORY_RE.search(html)
+    status = label.group(1).strip() if label else ''
+    return {
+        'status': status,
+        'pending': not status or bool(SUBMISSION_PENDING_RE.search(status)),
+        'time': int(exec_time.group(1)) if exec_time else None,
+        'memory': int(memory.group(1)) if memory else None
+    }
+
+
+def print_submission_status(task_name, submission_id, status):
+    print(f"{task_name} ({submission_id}) : ", end='')
+    if status['pending']:
+        print(status['status'])
+        return
+    cprint(status['status'],
+           'green' if status['status'] == 'AC' else 'yellow', end='')
+    if status['time'] is not None:
+        print(f" {status['time']} ms", end='')
+    if status['memory'] is not None:
+        print(f" {status['memory']} KB", end='')
+    print()
+
+
+class SubmissionTracker:
+    def __init__(self, contest_name):
+        self.status_url = urljoin(
+            BASE_URL, f"contests/{contest_name}/submissions/me/status/json")
+        self.lock = threading.Lock()
+        self.submissions = dict()
+        self.finished = False
+        self.thread = threading.Thread(target=self.poll, daemon=True)
+
+    def add(self, submission_id, task_name):
+        with self.lock:
+            if self.finished:
+                return False
+            self.submissions[submission_id] = {'task': task_name,
+                                               'status': None}
+            return True
+
+    def fetch_statuses(self, ses, submission_ids):
+        import requests
+        try:
+            r = ses.get(self.status_url, params={'sids[]': submission_ids})
+            return r.json().get('Result', dict())
+        except (requests.RequestException, ValueError):
+            return dict()
+
+    def poll(self):
+        ses = load_ses()
+        interval = SUBMISSION_POLL_INTERVAL
+        while True:
+            with self.lock:
+                if not self.submissions:
+                    self.finished = True
+                    return
+                submission_ids = list(self.submissions)
+
+            changed = False
+            for submission_id, result in \
+                    self.fetch_statuses(ses, submission_ids).items():
+                with self.lock:
+                    submission = self.submissions.get(submission_id)
+                if submission is None:
+                    continue
+                status = parse_submission_status(result.get('Html', ''))
+                if status['status'] != submission['status']:
+                    submission['status'] = status['status']
+                    print_submission_status(submission['task'],
+                                            submission_id, status)
+                    changed = True
+                if not status['pending']:
+                    with self.lock:
+                        del self.submissions[submission_id]
+
+            if not changed:
+                interval = min(interval * 1.5, SUBMISSION_MAX_POLL_INTERVAL)
+            time.sleep(interval)
+
+
+trackers = dict()
+trackers_lock = threading.Lock()
+
+
+def track_submission(contest_name, submission_id, task_name):
+    with trackers_lock:
+        tracker = trackers.get(contest_name)
+        if tracker is None or not tracker.add(submission_id, task_name):
+            tracker = SubmissionTracker(contest_name)
+            tracker.add(submission_id, task_name)
+            trackers[contest_name] = tracker
+            tracker.thread.start()
+
+
+def parse_task_numbers(tasks):
+    task_numbers = []
+    for part in tasks.split(','):
+        if '-' in part:
+            first, last = part.split('-', 1)
+            task_numbers.extend(range(convert_to_task_number(first),
+                                      convert_to_task_number(last) + 1))
+        elif part:
+            task_numbers.append(convert_to_task_number(part))
+    return list(dict.fromkeys(task_numbers))
+
+
+def find_task_source(src_dir, contest_name, task_number):
+    task_name = convert_to_task_name(task_number).lower()
+    names = (task_name, f"{contest_name}_{task_name}")
+    for entry in sorted(os.listdir(src_dir)):
+        path = os.path.join(src_dir, entry)
+        stem, ext = os.path.splitext(entry)
+        if stem.lower() not in names:
+            continue
+        if os.path.isfile(path) and ext in SOURCE_EXTS:
+            return path
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if os.path.splitext(name)[1] in SOURCE_EXTS:
+                    return os.path.join(path, name)
+    return None
+
+
+def make_case_report(key, result):
+    case_report = {
+        'name': key,
+        'verdict': result['verdict'] or 'AC',
+        'wall time': result['wall time'],
+        'cpu time': result['cpu time'],
+        'memory': result['memory']
+    }
+    if result['mismatch']:
+        case_report['mismatch'] = result['mismatch']
+    return case_report
+
+
+def build_batch_source(src_path):
+    start_time = time.monotonic()
+    try:
+        verdict = None if build(src_path) else 'CE'
+        error = None
+    except OSError as e:
+        verdict = 'ERROR'
+        error = str(e)
+    return {'verdict': verdict, 'error': error,
+            'build time': round(time.monotonic() - start_time, 3)}
+
+
+def test_task(contest_name, task_number, src_path, build_result,
+              enforce_limits=False, jobs=1):
+    report = {'task': convert_to_task_name(task_number), 'source': src_path,
+              'verdict': '', 'build time': None, 'cases': []}
+    testcases = load_testcases(contest_name, task_number)
+    if not testcases:
+        report['verdict'] = 'NO TESTCASES'
+        return report
+    if src_path is None:
+        report['verdict'] = 'NO SOURCE'
+        return report
+
+    report['build time'] = build_result['build time']
+    if build_result['verdict']:
+        report['verdict'] = build_result['verdict']
+        if build_result['error']:
+            report['error'] = build_result['error']
+        return report
+
+    targets = select_testcases(testcases, None)
+    try:
+        results = [(key, result) for key, _, result
+                   in run_testcases(testcases, targets, 1, enforce_limits,
+                                    src_path=src_path)]
+    except OSError as e:
+        report['verdict'] = 'ERROR'
+        report['error'] = str(e)
+        return report
+    report['cases'] = [make_case_report(key, result)
+                       for key, result in results]
+    regressions = record_history(contest_name, task_number, results,
+                                 src_path, jobs=jobs)
+    print_regressions(regressions)
+    report['regressions'] = [
+        {'name': key, 'previous wall time': previous_time,
+         'wall time': wall_time}
+        for key, previous_time, wall_time in regressions]
+    verdicts = [case['verdict'] for case in report['cases']]
+    report['verdict'] = next((verdict for verdict in verdicts
+                              if verdict != 'AC'), 'AC')
+    return report
+
+
+def test_batch(contest_name, task_numbers, src_dir=None, jobs=1,
+               enforce_limits=False):
+    if not load_index(contest_name)['tasks']:
+        download_all_testcases(contest_name)
+
+    if src_dir:
+        src_paths = [find_task_source(src_dir, contest_name, task_number)
+                     for task_number in task_numbers]
+    else:
+        src_paths = [load_src_path()] * len(task_numbers)
+
+    # Each distinct source is built once before the tasks fan out, so that
+    # no thread rewrites an executable while another one is running it.
+    distinct_src_paths = list(dict.fromkeys(
+        src_path for src_path in src_paths if src_path is not None))
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        build_results = dict(zip(distinct_src_paths, executor.map(
+            build_batch_source, distinct_src_paths)))
+        futures = [executor.submit(test_task, contest_name, task_number,
+                                   src_path, build_results.get(src_path),
+                                   enforce_limits, jobs)
+                   for task_number, src_path in zip(task_numbers, src_paths)]
+        tasks = [future.result() for future in futures]
+
+    verdicts = [task['verdict'] for task in tasks]
+    if any(verdict in ('NO TESTCASES', 'NO SOURCE', 'ERROR')
+           for verdict in verdicts):
+        exit_code = EXIT_ERROR
+    elif all(verdict == 'AC' for verdict in verdicts):
+        exit_code = EXIT_AC
+    else:
+        exit_code = EXIT_FAILED
+    return {'contest': contest_name, 'passed': exit_code == EXIT_AC,
+            'tasks': tasks}, exit_code
+
+
+def run_cli(argv):
+    import argparse
+    from contextlib import redirect_stdout
+    parser = argparse.ArgumentParser(prog='AtCoderSupporter.py')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    test_parser = subparsers.add_parser(
+        'test', help="build and test tasks, and print a JSON report")
+    test_parser.add_argument('contest_name')
+    test_parser.add_argument('tasks', help="e.g. A, A-F or A,C,E")
+    test_parser.add_argument('--src-dir',
+                             help="directory with a.cpp, abc300_b.py, "
+                             "c/Main.java, ... (default: src_path)")
+    test_parser.add_argument('-j', '--jobs', type=int,
+                             default=os.cpu_count() or 1)
+    test_parser.add_argument('-l', '--limits', action='store_true',
+                             help="enforce CPU time and memory limits")
+    test_parser.add_argument('-o', '--output',
+                             help="write the report here instead of stdout")
+
+    download_parser = subparsers.add_parser('download',
+                                            help="download testcases")
+    download_parser.add_argument('contest_name')
+    download_parser.add_argument('-j', '--jobs', type=int,
+                                 default=DOWNLOAD_JOBS)
+    download_parser.add_argument('-r', '--rate', type=float,
+                                 default=DOWNLOAD_RATE,
+                                 help="requests per second after a burst "
+                                      "of --jobs requests")
+    download_parser.add_argument('-f', '--force', action='store_true')
+
+    args = parser.parse_args(argv)
+    contest_name = args.contest_name.lower()
+    if args.command == 'download':
+        return (EXIT_AC if download_all_testcases(contest_name, True,
+                                                  args.jobs, args.force,
+                                                  rate=args.rate)
+                else EXIT_ERROR)
+
+    with redirect_stdout(sys.stderr):
+        report, exit_code = test_batch(contest_name,
+                                       parse_task_numbers(args.tasks),
+                                       args.src_dir, max(args.jobs, 1),
+                                       args.limits)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+    else:
+        print(json.dumps(report, indent=4))
+    return exit_code
+
+
+def print_startup_profile(main_begin):
+    print(f"Startup CPU time : {time.process_time() * 1000:.1f} ms")
+    print(f"Setup time : {(time.perf_counter() - main_begin) * 1000:.1f} ms")
+    loaded = [name for name in LAZY_MODULES if name in sys.modules]
+    print(f"Lazy modules loaded : {', '.join(loaded) if loaded else 'none'}")
+    print(f"Session validated : {session_validated.is_set()}")
+
+
 if __name__ == "__main__":
+    main_begin = time.perf_counter()
     colorama.init()
 
+    tracer.enabled = '--trace' in sys.argv[1:]
+    argv = [arg for arg in sys.argv[1:]
+            if arg not in ('--startup-profile', '--trace')]
+    if argv:
+        os.makedirs(TESTCASES_DIR, exist_ok=True)
+        sys.exit(run_cli(argv))
+
     print("--- AtCoder Supporter ---")
 
     if not os.path.exists(SAVE_DIR):
@@ -640,7 +3643,8 @@ if __name__ == "__main__":
     if not os.path.exists(TESTCASES_DIR):
         os.mkdir(TESTCASES_DIR)
 
-    login()
+    if '--startup-profile' in sys.argv[1:]:
+        print_startup_profile(main_begin)
 
     contest_name = ''
     task_number = -1
@@ -657,30 +3661,83 @@ if __name__ == "__main__":
                 command = tmp_command
 
             if re.fullmatch(r'src_path', command[0]):
+                state.invalidate(SRC_PATH_TXT_PATH)
                 save_src_path(command[1] if len(command) >= 2 else '')
 
+            elif re.fullmatch(r'cpp_flags', command[0]):
+                if len(command) >= 2 and command[1] == '-d':
+                    save_cpp_flags(DEFAULT_CPP_FLAGS)
+                elif len(command) >= 2:
+                    save_cpp_flags(command[1:])
+                print(f"C++ compiler flags : {' '.join(load_cpp_flags())}")
+
             elif re.fullmatch(r'login|l', command[0]):
+                state.invalidate(SESSION_PICKLE_PATH)
                 login(True)
 
             elif re.fullmatch(r'check|c', command[0]):
                 check(command)
 
             elif re.fullmatch(r'download|d', command[0]):
+                args, jobs = get_jobs(command, DOWNLOAD_JOBS)
+                args, rate = get_rate(args)
+                if rate is None:
+                    continue
+                force = '-f' in args
+                args = [arg for arg in args if arg != '-f']
+                if len(args) >= 2:
+                    contest_name = correct_contest_name(contest_name,
+                                                        args[1])
+                download_all_testcases(contest_name, True, jobs, force,
+                                       rate=rate)
+
+            elif re.fullmatch(r'mirror', command[0]):
+                args, jobs = get_jobs(command, DOWNLOAD_JOBS)
+                args, rate = get_rate(args)
+                if rate is None:
+                    continue
+                if len(args) < 2:
+                    print("Usage : mirror abc001-350 [contest_name ...] "
+                          "[-j N] [-r rate]")
+                    continue
+                mirror_contests(parse_contest_names(args[1:]), jobs, rate)
+
+            elif re.fullmatch(r'prefetch', command[0]):
+                if '-c' in command:
+                    cancel_prefetch()
+                    continue
                 if len(command) >= 2:
                     contest_name = correct_contest_name(contest_name,
                                                         command[1])
-                download_all_testcases(contest_name, True)
+                if contest_name:
+                    start_prefetch(contest_name)
 
             elif re.fullmatch(r'run|r', command[0]):
                 run('-nb' in command,
                     '-no' not in command,
                     '-ne' not in command)
 
-            elif re.fullmatch(r'test|t|submit', command[0]):
+            elif re.fullmatch(r'test|t|submit|watch|w', command[0]):
+                args, jobs = get_jobs(command)
+                enforce_limits = '-l' in args
+                warm = '-w' in args
+                args = [arg for arg in args if arg not in ('-l', '-w')]
+                args, testcase_dir = get_option(args, '--dir')
                 contest_name, new_task_number, testcase_number = \
-                    update_testcase(command,
+                    update_testcase(args,
                                     contest_name, task_number, testcase_number)
 
+                if testcase_dir and re.fullmatch(r'test|t', command[0]):
+                    info = dict(DEFAULT_TESTCASE_INFO)
+                    new_testcases = load_testcases(contest_name,
+                                                   new_task_number)
+                    if new_testcases:
+                        task_number = new_task_number
+                        info.update(new_testcases['info'])
+                    test_dir(testcase_dir, info, jobs, enforce_limits, warm,
+                             contest_name, task_number)
+                    continue
+
                 if not download_all_testcases(contest_name):
                     continue
 
@@ -692,11 +3749,74 @@ if __name__ == "__main__":
                     continue
 
                 if re.fullmatch(r'test|t', command[0]):
-                    test_all(contest_name, task_number, testcase_number)
+                    test_all(contest_name, task_number, testcase_number,
+                             jobs, enforce_limits, warm)
 
                 elif re.fullmatch(r'submit', command[0]):
                     submit(contest_name, task_number)
 
+                elif re.fullmatch(r'watch|w', command[0]):
+                    watch(contest_name, task_number, testcase_number, jobs,
+                          enforce_limits, warm)
+
+            elif re.fullmatch(r'stress', command[0]):
+                args, jobs = get_jobs(command, os.cpu_count() or 1)
+                args, count = get_option(args, '-n', STRESS_COUNT)
+                args, seed = get_option(args, '-s', random.randrange(1 << 30))
+                if (len(args) < 3 or not str(count).isdecimal()
+                   or not str(seed).isdecimal()):
+                    print("Usage : stress generator reference "
+                          "[-n count] [-s seed] [-j N]")
+                    continue
+                maximum_error = 0
+                if task_number >= 0:
+                    info = load_testcases(contest_name,
+                                          task_number).get('info', dict())
+                    maximum_error = info.get('maximum error', 0)
+                stress(args[1], args[2], int(count), int(seed), jobs,
+                       maximum_error)
+
+            elif re.fullmatch(r'complexity', command[0]):
+                args, max_size = get_option(command, '-n')
+                args, variable = get_option(args, '-v', 'N')
+                if len(args) < 2:
+                    print("Usage : complexity generator [-n max_size] "
+                          "[-v variable]")
+                    continue
+                info = dict()
+                if task_number >= 0:
+                    info = load_testcases(contest_name,
+                                          task_number).get('info', dict())
+                constraints = info.get('constraints', dict())
+                if max_size is None and constraints:
+                    first_value = next(iter(constraints.values()))
+                    max_size = constraints.get(variable, first_value)
+                if not str(max_size).isdecimal():
+                    print("The maximum size cannot be found. "
+                          "Specify it with -n.")
+                    continue
+                estimate_complexity(args[1], int(max_size),
+                                    info.get('time limit', 2))
+
+            elif re.fullmatch(r'history', command[0]):
+                if len(command) >= 2:
+                    task_number = convert_to_task_number(command[1])
+                if task_number < 0:
+                    print("Usage : history [task_number]")
+                    continue
+                print_history(contest_name, task_number)
+
+            elif re.fullmatch(r'profile', command[0]):
+                contest_name, new_task_number, testcase_number = \
+                    update_testcase(command,
+                                    contest_name, task_number, testcase_number)
+                if load_testcases(contest_name, new_task_number):
+                    task_number = new_task_number
+                if task_number < 0:
+                    print("Testcases cannot be found.")
+                    continue
+                profile(contest_name, task_number, testcase_number)
+
             elif re.fullmatch(r'exit|e', command[0]):
                 break
 
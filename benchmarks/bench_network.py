@@ -0,0 +1,115 @@
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from urllib.parse import urljoin
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARKS_DIR)
+from mock_atcoder import MockAtCoder, CONTEST_NAME, JUDGE_STEPS  # noqa: E402
+
+REQUEST_BUDGETS = {
+    'login': 3,
+    'correct_contest_name (cached)': 0,
+    'download_all_testcases (cached)': 0,
+    'submit (until judged)': 2 + len(JUDGE_STEPS)
+}
+
+
+def setup(acs, workdir):
+    os.makedirs(acs.TESTCASES_DIR)
+    src_path = os.path.join(workdir, 'main.py')
+    with open(src_path, 'w') as f:
+        f.write("print(input())\n")
+    acs.save_src_path(src_path)
+    acs.rcv_entered_account_info = lambda: {
+        'username': 'bench', 'password': acs.encrypt('bench')}
+
+
+def get_scenarios(acs):
+    submit_url = urljoin(acs.BASE_URL, f"contests/{CONTEST_NAME}/submit")
+
+    def revalidate():
+        ttl = acs.HTTP_CACHE_TTL
+        acs.HTTP_CACHE_TTL = 0
+        try:
+            return acs.download_all_testcases(CONTEST_NAME, True)
+        finally:
+            acs.HTTP_CACHE_TTL = ttl
+
+    def submit_until_judged():
+        acs.submit(CONTEST_NAME, 0)
+        for tracker in list(acs.trackers.values()):
+            tracker.thread.join()
+
+    return [
+        ('login', lambda: acs.login(True)),
+        ('correct_contest_name (cold)',
+         lambda: acs.correct_contest_name('', CONTEST_NAME)),
+        ('download_all_testcases (cold)',
+         lambda: acs.download_all_testcases(CONTEST_NAME, True)),
+        ('download_all_testcases (cached)',
+         lambda: acs.download_all_testcases(CONTEST_NAME, True)),
+        ('download_all_testcases (revalidate)', revalidate),
+        ('correct_contest_name (cached)',
+         lambda: acs.correct_contest_name('', CONTEST_NAME)),
+        ('fetch_task_name', lambda: acs.fetch_task_name(submit_url, 0)),
+        ('submit (until judged)', submit_until_judged),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help="seconds added to every response")
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help="probability of answering 503")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    mock = MockAtCoder(args.latency, args.error_rate, args.seed)
+    os.environ['ATCODER_SUPPORTER_BASE_URL'] = mock.start()
+    workdir = tempfile.mkdtemp(prefix='bench_network_')
+    os.chdir(workdir)
+    sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+    import AtCoderSupporter as acs
+
+    with redirect_stdout(io.StringIO()):
+        setup(acs, workdir)
+
+    print(f"{'command':<40}{'requests':>9}{'304':>5}{'errors':>8}"
+          f"{'sent KB':>9}{'recv KB':>9}{'wall ms':>9}")
+    over_budget = []
+    for name, scenario in get_scenarios(acs):
+        mock.reset_stats()
+        with redirect_stdout(io.StringIO()):
+            start_time = time.perf_counter()
+            scenario()
+            wall_time = time.perf_counter() - start_time
+            stats = mock.get_stats()
+            time.sleep(0.2)
+        print(f"{name:<40}{stats['requests']:>9}{stats['not modified']:>5}"
+              f"{stats['injected errors']:>8}"
+              f"{stats['bytes received'] / 1024:>9.1f}"
+              f"{stats['bytes sent'] / 1024:>9.1f}{wall_time * 1000:>9.1f}")
+        budget = REQUEST_BUDGETS.get(name)
+        if budget is not None and stats['requests'] > budget:
+            over_budget.append(f"{name} ({stats['requests']} > {budget})")
+
+    for submission_id, polls in mock.get_judge_polls().items():
+        if polls != len(JUDGE_STEPS):
+            over_budget.append(f"status of {submission_id} polled {polls} "
+                               f"times ({len(JUDGE_STEPS)} steps)")
+
+    mock.stop()
+    if over_budget:
+        print(f"Over the request budget : {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
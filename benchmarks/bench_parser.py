@@ -0,0 +1,77 @@
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import AtCoderSupporter as acs  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+REPEAT = 200
+
+
+def measure(parser, html, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parser(html)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else REPEAT
+    paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html')))
+    if not paths:
+        print(f"No fixtures in {FIXTURES_DIR}")
+        return 1
+
+    mismatches = 0
+    wrong = 0
+    total_reference = 0
+    total_fast = 0
+    print(f"{'fixture':<24}{'bs4 (ms)':>12}{'fast (ms)':>12}{'speedup':>10}")
+    for path in paths:
+        with open(path, encoding='utf-8', newline='') as f:
+            html = f.read()
+        name = os.path.basename(path)
+        reference = acs.parse_task_page(html)
+        fast = acs.parse_task_page_fast(html)
+        if reference != fast:
+            mismatches += 1
+            print(f"{name}: MISMATCH")
+            print(f"  bs4 : {reference}")
+            print(f"  fast: {fast}")
+            continue
+        expected_path = os.path.splitext(path)[0] + '.json'
+        if os.path.exists(expected_path):
+            with open(expected_path, encoding='utf-8') as f:
+                expected = json.load(f)
+            if fast != expected:
+                wrong += 1
+                print(f"{name}: WRONG")
+                print(f"  expected: {expected}")
+                print(f"  parsed  : {fast}")
+                continue
+        reference_time = measure(acs.parse_task_page, html, repeat)
+        fast_time = measure(acs.parse_task_page_fast, html, repeat)
+        total_reference += reference_time
+        total_fast += fast_time
+        print(f"{name:<24}{reference_time * 1000:>12.3f}"
+              f"{fast_time * 1000:>12.3f}"
+              f"{reference_time / fast_time:>9.1f}x")
+
+    if total_fast:
+        print(f"{'total':<24}{total_reference * 1000:>12.3f}"
+              f"{total_fast * 1000:>12.3f}"
+              f"{total_reference / total_fast:>9.1f}x")
+    if mismatches:
+        print(f"{mismatches} fixture(s) parsed differently")
+    if wrong:
+        print(f"{wrong} fixture(s) differ from the expected result")
+    if mismatches or wrong:
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
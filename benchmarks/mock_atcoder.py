@@ -0,0 +1,239 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+CONTEST_NAME = 'abc300'
+CSRF_TOKEN = 'mock-csrf-token'
+SESSION_LIFETIME = 30 * 24 * 60 * 60
+LANGUAGES = {'5001': 'C++ 20 (gcc 12.2)', '5005': 'Java (OpenJDK 17)',
+             '5055': 'Python (CPython 3.11.4)'}
+JUDGE_STEPS = ('WJ', 'WJ', '1/5', '3/5', '3/5', '5/5', 'AC')
+
+
+def load_task_pages():
+    paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, '*.html')))
+    pages = dict()
+    for i, path in enumerate(paths):
+        with open(path, encoding='utf-8', newline='') as f:
+            pages[f"{CONTEST_NAME}_{chr(ord('a') + i)}"] = f.read()
+    return pages
+
+
+def make_tasks_page(task_names):
+    rows = ''.join(
+        f'<tr><td><a href="/contests/{CONTEST_NAME}/tasks/{name}">'
+        f'{name[-1].upper()}</a></td><td>2 sec</td><td>1024 MB</td></tr>\n'
+        for name in task_names)
+    return f'<html><body><table>\n{rows}</table></body></html>'
+
+
+def make_submit_page(task_names):
+    tasks = ''.join(f'<option value="{name}">{name}</option>'
+                    for name in task_names)
+    languages = ''.join(f'<option value="{language_id}">{name}</option>'
+                        for language_id, name in LANGUAGES.items())
+    return (f'<html><body><form><select id="select-task">{tasks}</select>'
+            f'<select name="data.LanguageId">{languages}</select>'
+            '</form></body></html>')
+
+
+def make_status_html(status):
+    if status != JUDGE_STEPS[-1]:
+        return (f"<td><span class='label label-default'>{status}</span>"
+                "</td><td></td><td></td>")
+    return (f"<td><span class='label label-success'>{status}</span></td>"
+            "<td>1 ms</td><td>3600 KB</td>")
+
+
+class MockAtCoder:
+    def __init__(self, latency=0, error_rate=0, seed=0):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.task_pages = load_task_pages()
+        self.submission_id = 1000
+        self.judge_polls = dict()
+        self.server = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {'requests': 0, 'bytes sent': 0,
+                          'bytes received': 0, 'not modified': 0,
+                          'injected errors': 0, 'status polls': 0}
+
+    def get_stats(self):
+        with self.lock:
+            return dict(self.stats)
+
+    def count(self, name, value=1):
+        with self.lock:
+            self.stats[name] += value
+
+    def should_fail(self):
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def judge(self, submission_id):
+        with self.lock:
+            polls = self.judge_polls.get(submission_id, 0)
+            self.judge_polls[submission_id] = polls + 1
+        return JUDGE_STEPS[min(polls, len(JUDGE_STEPS) - 1)]
+
+    def get_judge_polls(self):
+        with self.lock:
+            return dict(self.judge_polls)
+
+    def next_submission_id(self):
+        with self.lock:
+            self.submission_id += 1
+            return self.submission_id
+
+    def get_page(self, path):
+        task_names = list(self.task_pages)
+        contest_path = f'/contests/{CONTEST_NAME}'
+        if path == '/login':
+            return ('<html><body><form><input type="hidden" '
+                    f'name="csrf_token" value="{CSRF_TOKEN}"/>'
+                    '</form></body></html>')
+        if path == '/home':
+            return '<html><body>home</body></html>'
+        if path == contest_path:
+            return ('<html><body><time class="fixtime-full">'
+                    '2023-04-29 21:00:00+0900</time></body></html>')
+        if path == f'{contest_path}/tasks':
+            return make_tasks_page(task_names)
+        if path.startswith(f'{contest_path}/tasks/'):
+            return self.task_pages.get(path.split('/')[-1])
+        if path == f'{contest_path}/submit':
+            return make_submit_page(task_names)
+        if path == f'{contest_path}/submissions/me':
+            return ('<html><body><table><tr><td class="text-right '
+                    f'submission-score" data-id="{self.submission_id}">'
+                    '0</td></tr></table></body></html>')
+        return None
+
+    def start(self, port=0):
+        class Handler(MockHandler):
+            mock = self
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        return f'http://127.0.0.1:{self.server.server_port}/'
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    mock = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def reply(self, status, body=b'', headers=None):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or dict()).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.mock.count('bytes sent', len(body))
+
+    def begin(self):
+        self.mock.count('requests')
+        if self.mock.latency:
+            time.sleep(self.mock.latency)
+        url = urlparse(self.path)
+        if url.path != '/login' and self.mock.should_fail():
+            self.mock.count('injected errors')
+            self.reply(503, 'Service Unavailable')
+            return None
+        return url
+
+    def do_GET(self):
+        url = self.begin()
+        if url is None:
+            return
+        if url.path.endswith('/submissions/me/status/json'):
+            submission_ids = parse_qs(url.query).get('sids[]', [])
+            self.mock.count('status polls')
+            self.reply(200, json.dumps({
+                'Result': {submission_id: {'Html': make_status_html(
+                               self.mock.judge(submission_id))}
+                           for submission_id in submission_ids},
+                'Interval': 1000}))
+            return
+
+        body = self.mock.get_page(url.path)
+        if body is None:
+            self.reply(404, 'Not Found')
+            return
+        etag = '"' + hashlib.sha1(body.encode('utf-8')).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.mock.count('not modified')
+            self.reply(304, headers={'ETag': etag})
+            return
+        self.reply(200, body, {'ETag': etag,
+                               'Content-Type': 'text/html; charset=utf-8'})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        self.mock.count('bytes received', length)
+        url = self.begin()
+        if url is None:
+            return
+        if form.get('csrf_token') != [CSRF_TOKEN]:
+            self.reply(403, 'Forbidden')
+        elif url.path == '/login':
+            expires = formatdate(time.time() + SESSION_LIFETIME,
+                                 usegmt=True)
+            self.reply(302, headers={
+                'Location': '/home',
+                'Set-Cookie': f'REVEL_SESSION=mock; Path=/; '
+                              f'Expires={expires}; HttpOnly'})
+        elif url.path == f'/contests/{CONTEST_NAME}/submit':
+            self.mock.next_submission_id()
+            self.reply(302, headers={
+                'Location': f'/contests/{CONTEST_NAME}/submissions/me'})
+        else:
+            self.reply(404, 'Not Found')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0,
+                        help="seconds added to every response")
+    parser.add_argument('--error-rate', type=float, default=0,
+                        help="probability of answering 503")
+    args = parser.parse_args()
+
+    mock = MockAtCoder(args.latency, args.error_rate)
+    base_url = mock.start(args.port)
+    print(f"Serving a mock AtCoder for {CONTEST_NAME} on {base_url}")
+    print(f"export ATCODER_SUPPORTER_BASE_URL={base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == '__main__':
+    main()
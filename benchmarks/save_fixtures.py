@@ -0,0 +1,35 @@
+import os
+import sys
+from urllib.parse import urljoin
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+import AtCoderSupporter as acs  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+DEFAULT_TASKS = ('abc001_1', 'arc001_1', 'abc300_a', 'abc350_g')
+
+
+def task_url(task_name):
+    contest_name = task_name.rsplit('_', 1)[0]
+    return urljoin(acs.BASE_URL, f"contests/{contest_name}/tasks/{task_name}")
+
+
+def main():
+    task_names = sys.argv[1:] or DEFAULT_TASKS
+    ses = requests.Session()
+    for task_name in task_names:
+        r = ses.get(task_url(task_name))
+        if r.status_code != 200:
+            print(f"{task_name}: HTTP {r.status_code}")
+            return 1
+        path = os.path.join(FIXTURES_DIR, f"{task_name}.html")
+        with open(path, 'wb') as f:
+            f.write(r.content)
+        print(f"{task_name}: saved {len(r.content)} bytes to {path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())